@@ -15,7 +15,7 @@ def _():
 def _(mo):
     CURRENT_SCRIPT = "importació"
     script_path = mo.notebook_location() / "public" / f"{CURRENT_SCRIPT}.bat"
-    DOWNLOAD_INSTRUCTIONS = f"""Descarregueu-vos [aquest fitxer]({script_path}) i arrossegueu-hi el CSV que voleu importar a Clickedu per fer-lo córrer. Cal que navegueu fins a la pàgina correcta en menys de tres minuts des que s'hagi obert el navegador. Un cop el programa hagi fet els canvis i els hagueu comprovat, guardeu en menys de 15 minuts. El programa tancarà el navegador en aquest temps o abans si guardeu els canvis."""
+    DOWNLOAD_INSTRUCTIONS = f"""Descarregueu-vos [aquest fitxer]({script_path}) i arrossegueu-hi el CSV que voleu importar a Clickedu per fer-lo córrer. També hi podeu arrossegar directament el resum descarregat de l'aplicació de resum (en CSV, Parquet o Arrow IPC): els imports a cobrar i les devolucions s'importen als conceptes «Cobrar» i «Devolucions». Cal que navegueu fins a la pàgina correcta en menys de tres minuts des que s'hagi obert el navegador. Un cop el programa hagi fet els canvis i els hagueu comprovat, guardeu en menys de 15 minuts. El programa tancarà el navegador en aquest temps o abans si guardeu els canvis."""
 
     mo.md(DOWNLOAD_INSTRUCTIONS)
     return
@@ -1,43 +1,35 @@
+# /// script
+# requires-python = ">=3.13"
+# dependencies = [
+#     "marimo",
+#     "polars>=1.31.0",
+# ]
+# ///
+
 import marimo
 
 __generated_with = "0.18.4"
 app = marimo.App(width="medium")
 
+with app.setup:
+    import asyncio
+    import hashlib
+    import io
+    import json
+    import re
+    import sys
+    import time
+    from collections import OrderedDict
+    from collections.abc import Callable
+    from dataclasses import asdict, dataclass, replace
+    from pathlib import Path
+    from typing import Any, Literal
 
-@app.cell
-def _():
-    import marimo as mo  # Recommended by Marimo to be imported as first and only
-
-    return (mo,)
-
-
-@app.cell
-def _():
-    import calendar
-    import numpy as np
     import polars as pl
 
-    return calendar, np, pl
-
-
-@app.cell
-def _(mo):
-    # Define necessary constants
+    # Define the constants needed to process the files, also outside the notebook
     PERMANENT_TYPE = 1
     TEMPORARY_TYPE = 2
-    TITLE_TEMPORARY_PRICE = (
-        "**Introduïu els preus en funció dels dies que s'ha quedat l'alumne:**"
-    )
-    TEMPORARY_PRICE_LABEL = "Preu (en €) per >{min_days} dies:"
-    TITLE_TEMPORARY_MAX_PRICE = "**Introduïu el preu màxim per alumnes puntuals:**"
-    TITLE_PERMANENT_PRICE = "**Introduïu el descompte per faltar un dia:**"
-    PERMANENT_PRICE_LABEL = "Descompte{type} (en €, serà considerat negatiu):"
-    TITLE_MIN_DAYS_TO_DISCOUNT = (
-        "**Introduïu el mínim nombre de dies per començar a descomptar absències:**"
-    )
-    SAVE_LABEL = "Utilitza els preus i descomptes modificats"
-    MAIN_FILE_LABEL = "Selecciona el fitxer amb les files per agrupar:"
-    DOWNLOAD_LABEL = "Descarrega l'Excel"
     N_ROWS_WITHOUT_RAW_DATA = 4
     FILE_NAME_COL = "Tarifa"
     COLS_TO_BE_REMOVED = [
@@ -53,69 +45,1060 @@ def _(mo):
     YEAR_COL = "Curs/classe"
     LEVEL_COL = "Nivell"
     CATEGORY_COL = "Inscripció"
+    NON_DATE_COLS = [STUDENT_NAME_COL, YEAR_COL, CATEGORY_COL, *COLS_TO_BE_REMOVED]
+    ATTENDANCE_PRIORITY = ["-", "A", "P"]  # From lowest to highest priority
+    # Read each attendance value as a small code ordered by priority instead of text
+    ATTENDANCE_TYPE = pl.Enum(ATTENDANCE_PRIORITY)
+    CATEGORY_TYPE = pl.Categorical(ordering="lexical")
     ENCODING = "ISO-8859-1"
-    CATEGORIES = {
+    # Names of the months to name the summaries, as the ones of the calendar module
+    # (which is not imported only for them, to start the app faster)
+    MONTH_NAMES = [
+        "",
+        "January",
+        "February",
+        "March",
+        "April",
+        "May",
+        "June",
+        "July",
+        "August",
+        "September",
+        "October",
+        "November",
+        "December",
+    ]
+    CATEGORIES: dict[str, dict[str, Any]] = {
         "Inscripció permanent": {"code": PERMANENT_TYPE, "type_to_count": "A"},
         "Inscripció puntual": {"code": TEMPORARY_TYPE, "type_to_count": "P"},
     }
     PRICE_COL = "price"
-    PRICE_LABEL = "Selecciona el fitxer amb els preus (alumnes puntuals):"
+    MIN_DAYS_COL = "min_days"
+    TYPE_COL = "type"
     MAX_PRICE_COL = "max"
     DISCOUNT_COL = "discount"
-    DISCOUNT_LABEL = (
-        "Selecciona el fitxer amb els descomptes per faltes (alumnes permanents):"
-    )
     MIN_DAYS_TO_DISCOUNT = 7
-    MIN_DAYS_TO_DISCOUNT_LABEL = "Mínim de dies:"
+    # Amounts of the summary, in cents until it is written
+    TO_CHARGE_COL = "Cobrar"
+    REFUNDS_COL = "Devolucions"
+    # Auxiliary columns to calculate the prices
+    ROW_INDEX_COL = "row_index"
+    N_DAYS_COL = "n_days"
     GROUP_TO_SINGLE_LINE_TOOL_LABEL = "Menjador"
     GROUP_TO_CATEGORY_LINE_TOOL_LABEL = "Acollida"
-    TOOLS = [
-        {"label": GROUP_TO_SINGLE_LINE_TOOL_LABEL, "code": "unique"},
-        {"label": GROUP_TO_CATEGORY_LINE_TOOL_LABEL, "code": "category"},
+    # The billing rules of each tool are data, so that a service with the same kind
+    # of rules only needs its configuration (see PricingRules)
+    TOOLS: list[dict[str, Any]] = [
+        {
+            "label": GROUP_TO_SINGLE_LINE_TOOL_LABEL,
+            "code": "unique",
+            "pricing": {
+                "rate_col": None,
+                "day_price_tiers": True,
+                "max_price": False,
+                "discounted_type": "A",
+                "min_days_to_discount": None,
+                "replaced_price_col": None,
+            },
+        },
+        {
+            "label": GROUP_TO_CATEGORY_LINE_TOOL_LABEL,
+            "code": "category",
+            "pricing": {
+                "rate_col": FILE_NAME_COL,
+                "day_price_tiers": False,
+                "max_price": True,
+                "discounted_type": "P",
+                "min_days_to_discount": MIN_DAYS_TO_DISCOUNT,
+                "replaced_price_col": MAX_PRICE_COL,
+            },
+        },
     ]
     UNIQUE_TOOL_CODE = "unique"
     UNIQUE_TOOL_LABEL = next(
         filter(lambda tool: tool["code"] == UNIQUE_TOOL_CODE, TOOLS), {"label": None}
     )["label"]
+    # Formats in which the summary can be downloaded, the CSV being like the exports
+    CSV_FORMAT = "CSV"
+    EXCEL_FORMAT = "Excel"
+    PARQUET_FORMAT = "Parquet"
+    ARROW_FORMAT = "Arrow IPC"
+    IMPORT_FORMAT = "Importació a Clickedu"
+    EXPORT_FORMATS = {
+        CSV_FORMAT: {"extension": "csv", "mimetype": "text/csv"},
+        EXCEL_FORMAT: {
+            "extension": "xlsx",
+            "mimetype": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        },
+        PARQUET_FORMAT: {
+            "extension": "parquet",
+            "mimetype": "application/vnd.apache.parquet",
+        },
+        ARROW_FORMAT: {
+            "extension": "arrow",
+            "mimetype": "application/vnd.apache.arrow.file",
+        },
+        # Named differently from the CSV summary, since it has the same extension
+        IMPORT_FORMAT: {
+            "extension": "csv",
+            "mimetype": "text/csv",
+            "suffix": "_importacio",
+        },
+    }
+    CSV_CHUNK_SIZE = 10_000  # Rows encoded at once when writing the CSV
+    TOTALS_SHEET = "Totals"
+    N_STUDENTS_COL = "Alumnes"
+    # Layout of the files of the importer into Clickedu: a row per student and a
+    # column per billable concept, where 0 removes the concept from the student
+    BILLING_NAME_COL = "Usuari"
+    # Billable concept of Clickedu of each amount, by default named as the amount
+    BILLING_CONCEPTS = {TO_CHARGE_COL: TO_CHARGE_COL, REFUNDS_COL: REFUNDS_COL}
+    # Directory where the last prices and discounts of each tool are kept between
+    # sessions, which in the browser is backed by its storage (IndexedDB)
+    PRICES_STORAGE_DIR = (
+        Path("/home/pyodide/preus")
+        if sys.platform == "emscripten"
+        else Path.home() / ".cache" / "small-automation-tools" / "preus"
+    )
+    # Files already read in the session, from least to most recently used, to avoid
+    # reading them again in every rerun of the notebook
+    READ_CACHE_SIZE = 8
+    read_cache: OrderedDict[tuple[Any, ...], Any] = OrderedDict()
+    # Hashes of the files of prices last stored for each tool (by its code), to
+    # store them only when they change instead of in every rerun
+    stored_uploads: dict[str, tuple[str, str]] = {}
 
-    tool_selection = mo.ui.radio(
-        options=[GROUP_TO_SINGLE_LINE_TOOL_LABEL, GROUP_TO_CATEGORY_LINE_TOOL_LABEL],
-        inline=True,
+
+@app.class_definition
+@dataclass(frozen=True)
+class AttendanceExport:
+    """Attendance export already read, with the information to name its summary."""
+
+    data: pl.DataFrame
+    rate: str | None
+    month_number: int
+
+
+@app.class_definition
+@dataclass(frozen=True)
+class StageMeasure:
+    """Time (in seconds), rows and estimated size of the result (in bytes) of a stage."""
+
+    stage: str
+    wall_time: float
+    rows_in: int | None
+    rows_out: int | None
+    memory: int | None
+
+
+@app.class_definition
+@dataclass(frozen=True)
+class PricingRules:
+    """Billing rules of a service, which are compiled into a single plan of Polars expressions.
+
+    Temporary students pay a daily price for each day they come, which can depend on
+    tiers of minimum days attended and be capped by a maximum price. Permanent
+    students are discounted the counted days, only below a minimum of days if there
+    is one, and either get each day refunded or pay those days instead of a price
+    of their rate.
+    """
+
+    # Column of the export whose rates have their own prices and discounts, if any
+    rate_col: str | None
+    # Whether the daily price depends on the minimum days attended
+    day_price_tiers: bool
+    # Whether the price of temporary students is capped by a maximum price
+    max_price: bool
+    # Attendance type counted to discount permanent students
+    discounted_type: str
+    # Permanent students are only discounted below this number of days, if any
+    min_days_to_discount: int | None
+    # Column of the prices that discounted permanent students do not pay, since they
+    # pay the days instead, if any
+    replaced_price_col: str | None
+
+
+@app.function
+def measure_stage[T](
+    stage: str, run: Callable[[], T], rows_in: int | None = None
+) -> tuple[T, StageMeasure]:
+    """Run a stage of the summary and measure its time, rows and memory."""
+    start = time.perf_counter()
+    result = run()
+    wall_time = time.perf_counter() - start
+    data = result.data if isinstance(result, AttendanceExport) else result
+    return result, StageMeasure(
+        stage=stage,
+        wall_time=wall_time,
+        rows_in=rows_in,
+        rows_out=data.height if isinstance(data, pl.DataFrame) else None,
+        memory=int(data.estimated_size())
+        if isinstance(data, pl.DataFrame)
+        else len(data)
+        if isinstance(data, bytes)
+        else None,
+    )
+
+
+@app.function
+def read_cached[T](read: Callable[..., T], *args: Any) -> T:
+    """Read some files only if the same contents were not read with the same options.
+
+    The files are identified by a hash of their contents, and only the most recently
+    used are kept.
+    """
+    key = (read.__name__,) + tuple(
+        hashlib.blake2b(arg).hexdigest() if isinstance(arg, bytes) else arg
+        for arg in args
+    )
+    if key in read_cache:
+        read_cache.move_to_end(key)
+        return read_cache[key]
+    result = read(*args)
+    read_cache[key] = result
+    if len(read_cache) > READ_CACHE_SIZE:
+        read_cache.popitem(last=False)
+    return result
+
+
+@app.function
+def read_prices(
+    prices_contents: bytes, discounts_contents: bytes, tool_code: str
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Read the prices and discounts sorted in the order the tool displays them."""
+    rules = get_pricing_rules(tool_code)
+    # The rates are displayed in alphabetical order and the tiers from the highest
+    rate_cols = [TYPE_COL] if rules.rate_col is not None else []
+    tier_cols = [MIN_DAYS_COL] if rules.day_price_tiers else []
+    temporary_day_prices = pl.read_csv(prices_contents, separator=";")
+    permanent_discount = pl.read_csv(discounts_contents, separator=";")
+    if rate_cols or tier_cols:
+        temporary_day_prices = temporary_day_prices.sort(
+            by=[*rate_cols, *tier_cols],
+            descending=[False] * len(rate_cols) + [True] * len(tier_cols),
+        )
+    if rate_cols:
+        permanent_discount = permanent_discount.sort(by=rate_cols)
+    return temporary_day_prices, permanent_discount
+
+
+@app.function
+def scan_attendance(contents: bytes, cast_attendance: bool = True) -> pl.LazyFrame:
+    """Scan an attendance export without its summary rows and unneeded columns."""
+    # Keep the column with information about the subcategory, which is needed to
+    # name the summary and by the category tool
+    cols_to_be_removed = [col for col in COLS_TO_BE_REMOVED if col != FILE_NAME_COL]
+    # Polars can only scan UTF-8, so the export is decoded in advance. The types
+    # of the columns are known, so there is no need for a pass to infer them
+    utf8_contents = contents.decode(ENCODING).encode()
+    export = pl.scan_csv(utf8_contents, separator=";", infer_schema=False)
+    date_cols = [
+        col for col in export.collect_schema().names() if col not in NON_DATE_COLS
+    ]
+    # Count the rows in advance, so that the summary rows are not even parsed
+    n_rows = export.select(pl.len()).collect().item()
+    export = (
+        pl.scan_csv(
+            utf8_contents,
+            separator=";",
+            infer_schema=False,
+            n_rows=max(n_rows - N_ROWS_WITHOUT_RAW_DATA, 0),
+            schema_overrides={
+                CATEGORY_COL: CATEGORY_TYPE,
+                FILE_NAME_COL: CATEGORY_TYPE,
+            },
+        )
+        # Only the remaining columns are read from the file
+        .drop(cols_to_be_removed, strict=False)
+    )
+    if not cast_attendance:
+        return export
+    # Current Polars version does not read enums correctly with the string cache
+    # enabled, so the attendance is converted as soon as it is read
+    return export.with_columns(pl.col(date_cols).cast(ATTENDANCE_TYPE))
+
+
+@app.function
+def find_unknown_attendance(data: pl.DataFrame) -> tuple[str, str] | None:
+    """Find the first date column with an attendance value that is not known, and the value."""
+    for col in data.columns:
+        if col in NON_DATE_COLS:
+            continue
+        values = data.get_column(col).drop_nulls()
+        unknown_values = values.filter(~values.is_in(ATTENDANCE_PRIORITY))
+        if not unknown_values.is_empty():
+            return col, unknown_values.item(0)
+    return None
+
+
+@app.function
+def read_attendance(contents: bytes) -> AttendanceExport:
+    """Read an attendance export with the rate and month to name its summary."""
+    try:
+        data = scan_attendance(contents).collect()
+    except pl.exceptions.InvalidOperationError as error:
+        # The conversion to the codes of the attendance fails with any other value
+        unknown_attendance = find_unknown_attendance(
+            scan_attendance(contents, cast_attendance=False).collect()
+        )
+        if unknown_attendance is None:
+            raise
+        col, value = unknown_attendance
+        raise ValueError(
+            f"The attendance of {col} has the value {value!r}, which is not one of {ATTENDANCE_PRIORITY}"
+        ) from error
+    rates = data.get_column(FILE_NAME_COL).head(1).to_list()
+    # The dates are the first columns without any other information
+    first_date = next(col for col in data.columns if col not in NON_DATE_COLS)
+    return AttendanceExport(
+        data=data,
+        rate=rates[0] if rates else None,
+        month_number=int(first_date.split("/")[1].split(" ")[0]),
+    )
+
+
+@app.function
+def count_row_values(cols: list[str], value: str) -> pl.Expr:
+    # Count horizontally how many of the columns hold the value, leaving it
+    # empty if there is none (as a missing key in a per-row count would)
+    n_values = pl.sum_horizontal(pl.col(cols) == value).cast(pl.Int64)
+    return pl.when(n_values > 0).then(n_values).alias(value)
+
+
+@app.function
+def select_highest_priority(col: str, priority: list[str]) -> pl.Expr:
+    # Aggregate the position of each value in the priority list natively
+    # and map the highest one back to its value. The values are compared as text,
+    # since categories would need a string cache shared with the list. Values
+    # that are not in the list have lower priority than all the ones in it, and
+    # if there are only such values, the last of them in alphabetical order is kept
+    values = pl.col(col).cast(pl.String)
+    codes = list(range(1, len(priority) + 1))
+    highest_code = values.replace_strict(
+        priority, codes, default=0, return_dtype=pl.UInt8
+    ).max()
+    return (
+        pl.when(highest_code == 0)
+        .then(values.max())
+        .otherwise(
+            highest_code.replace_strict(
+                codes, priority, default=None, return_dtype=pl.String
+            )
+        )
+        .alias(col)
+    )
+
+
+@app.function
+def group_attendance(data: pl.LazyFrame, rules: PricingRules) -> pl.LazyFrame:
+    """Group the rows of each student and count the days of each type.
+
+    The rows are grouped by the column of the rates of the rules, if they have one,
+    or else by the category.
+    """
+    if rules.rate_col is None:
+        # Without rates, the subcategories are not distinguished
+        data = data.drop(FILE_NAME_COL, strict=False)
+    value_columns = data.collect_schema().names()
+    if STUDENT_NAME_COL in value_columns:
+        value_columns.remove(STUDENT_NAME_COL)
+    if YEAR_COL in value_columns:
+        value_columns.remove(YEAR_COL)
+
+    sorting_cols = (
+        [LEVEL_COL, CATEGORY_COL, STUDENT_NAME_COL]
+        if rules.rate_col is None
+        else [LEVEL_COL, STUDENT_NAME_COL, CATEGORY_COL, rules.rate_col]
+    )
+    other_than_date_cols = [CATEGORY_COL, FILE_NAME_COL]
+    values_to_count = ["-"] + [
+        category["type_to_count"] for category in CATEGORIES.values()
+    ]
+    cols_to_group_by = [STUDENT_NAME_COL, rules.rate_col or CATEGORY_COL]
+    value_columns.remove(cols_to_group_by[-1])
+
+    # The category with the highest code has priority, so if both are present
+    # ('puntual' and 'permanent'), 'puntual' is kept
+    category_priority = sorted(
+        CATEGORIES, key=lambda category: CATEGORIES[category]["code"]
+    )
+
+    # Select the value with highest priority of each column (i.e. 'P' if present).
+    # For the year column, all the rows per student should have the same, so it is
+    # enough selecting the first. Then add up the corresponding type (A/P) based
+    # on the category (puntual/permanent)
+    return (
+        data.group_by(cols_to_group_by, maintain_order=True)
+        .agg(
+            # Generate the level column
+            [
+                pl.col(YEAR_COL)
+                .min()
+                .str.splitn(" / ", 2)
+                .struct.field("field_0")
+                .alias(LEVEL_COL)
+            ]
+            # If more than one row within the category,
+            # select the type with highest priority
+            + [
+                select_highest_priority(col, category_priority)
+                if col == CATEGORY_COL
+                # The codes of the attendance are already ordered by priority
+                else pl.col(col).to_physical().max().cast(ATTENDANCE_TYPE)
+                for col in value_columns
+            ]
+        )
+        # Keep the levels in the order they first appear in the export, which is the
+        # logical order, instead of the alphabetical one
+        .with_row_index(ROW_INDEX_COL)
+        .sort(
+            by=[
+                pl.col(ROW_INDEX_COL).min().over(LEVEL_COL),
+                *[pl.col(col) for col in sorting_cols[1:]],
+            ]
+        )
+        .drop(ROW_INDEX_COL)
+        .with_columns(pl.col(LEVEL_COL).cast(pl.datatypes.Categorical))
+        # Calculate the subtotals of each type and get each in a separate column
+        .with_columns(
+            [
+                count_row_values(
+                    # i.e. include only the date columns
+                    list(
+                        filter(
+                            lambda col: col not in other_than_date_cols, value_columns
+                        )
+                    ),
+                    value,
+                )
+                for value in values_to_count
+            ]
+        )
+    )
+
+
+@app.function
+def get_type_to_count(selected_type: int) -> str:
+    return next(
+        filter(
+            lambda category: category["code"] == selected_type,
+            CATEGORIES.values(),
+        ),
+        {"type_to_count": ""},
+    )["type_to_count"]
+
+
+@app.function
+def get_category_code() -> pl.Expr:
+    # Compared as text, since categories would need a string cache shared with
+    # the ones of the constant
+    return (
+        pl.col(CATEGORY_COL)
+        .cast(pl.String)
+        .replace_strict(
+            {category: info["code"] for category, info in CATEGORIES.items()},
+            default=None,
+        )
+    )
+
+
+@app.function
+def to_cents(amount: pl.Expr) -> pl.Expr:
+    # Round the amounts in euros to whole cents only once they are calculated, so
+    # that the prices keep all their decimals, and as Python's round does: the
+    # amount in cents is only rounded to even if it is exactly halfway, and
+    # otherwise towards its rounding error, which is found exactly by splitting the
+    # amount into two halves of its digits (Dekker's product)
+    cents = amount * 100
+    split = amount * 134_217_729  # 2**27 + 1
+    high = split - (split - amount)
+    error = (high * 100 - cents) + (amount - high) * 100
+    return (
+        pl.when((cents - cents.floor() == 0.5) & (error != 0))
+        .then(cents.floor() + (error > 0).cast(pl.Float64))
+        .otherwise(cents.round(0))
+        .cast(pl.Int64)
+    )
+
+
+@app.function
+def format_cents(cents: pl.Expr) -> pl.Expr:
+    # Write the euros with only the needed decimals and comma as decimal separator,
+    # since current Polars version cannot handle it
+    euros = cents.abs() // 100
+    remaining_cents = cents.abs() % 100
+    return pl.concat_str(
+        pl.when(cents < 0).then(pl.lit("-")).otherwise(pl.lit("")),
+        euros.cast(pl.String),
+        pl.when(remaining_cents == 0)
+        .then(pl.lit(""))
+        .when(remaining_cents % 10 == 0)
+        .then(pl.lit(",") + (remaining_cents // 10).cast(pl.String))
+        .otherwise(pl.lit(",") + remaining_cents.cast(pl.String).str.zfill(2)),
+    )
+
+
+@app.function
+def get_pricing_rules(
+    tool_code: str, min_days_to_discount: int = MIN_DAYS_TO_DISCOUNT
+) -> PricingRules:
+    """Rules of the tool with the code, with the minimum days to discount chosen in the app."""
+    rules = PricingRules(
+        **next(tool for tool in TOOLS if tool["code"] == tool_code)["pricing"]
+    )
+    if rules.min_days_to_discount is None:
+        return rules
+    return replace(rules, min_days_to_discount=min_days_to_discount)
+
+
+@app.function
+def get_price_cols(rules: PricingRules) -> list[str]:
+    # Columns of the prices of each rate or tier that the rules use
+    return list(
+        dict.fromkeys(
+            [
+                PRICE_COL,
+                *([MAX_PRICE_COL] if rules.max_price else []),
+                *([rules.replaced_price_col] if rules.replaced_price_col else []),
+            ]
+        )
+    )
+
+
+@app.function
+def validate_prices(
+    temporary_day_prices: pl.DataFrame,
+    permanent_discount: pl.DataFrame,
+    tool_code: str,
+) -> None:
+    """Check that the prices and discounts have the columns the rules of the tool need."""
+    rules = get_pricing_rules(tool_code)
+    rate_cols = [TYPE_COL] if rules.rate_col is not None else []
+    tables = {
+        "prices": (
+            temporary_day_prices,
+            [
+                *rate_cols,
+                *([MIN_DAYS_COL] if rules.day_price_tiers else []),
+                *get_price_cols(rules),
+            ],
+        ),
+        "discounts": (permanent_discount, [*rate_cols, DISCOUNT_COL]),
+    }
+    for name, (table, cols) in tables.items():
+        missing_cols = [col for col in cols if col not in table.columns]
+        if missing_cols:
+            raise ValueError(f"The {name} have no columns {missing_cols}")
+
+
+@app.function
+async def sync_prices_storage(from_browser: bool) -> None:
+    # The files of the browser are only in memory until they are synced with its
+    # storage, which Pyodide can only do asynchronously
+    if sys.platform != "emscripten":
+        return
+    import pyodide_js
+    from pyodide.ffi import create_once_callable
+
+    synced = asyncio.get_running_loop().create_future()
+    pyodide_js.FS.syncfs(
+        from_browser, create_once_callable(lambda error: synced.set_result(error))
+    )
+    error = await synced
+    if error:
+        raise OSError(f"Could not sync the stored prices: {error}")
+
+
+@app.function
+async def open_prices_storage(directory: Path = PRICES_STORAGE_DIR) -> Path:
+    """Prepare the directory of the stored prices, loading them from the browser if needed."""
+    directory.mkdir(parents=True, exist_ok=True)
+    if sys.platform == "emscripten":
+        import pyodide_js
+        from js import Object
+
+        if pyodide_js.FS.lookupPath(str(directory)).node.mounted is None:
+            pyodide_js.FS.mount(
+                pyodide_js.FS.filesystems.IDBFS, Object.new(), str(directory)
+            )
+        await sync_prices_storage(from_browser=True)
+    return directory
+
+
+@app.function
+def get_price_table_paths(storage: Path, tool_code: str) -> tuple[Path, Path]:
+    return (
+        storage / f"{tool_code}_prices.parquet",
+        storage / f"{tool_code}_discounts.parquet",
+    )
+
+
+@app.function
+def load_price_tables(
+    storage: Path, tool_code: str
+) -> tuple[pl.DataFrame, pl.DataFrame] | None:
+    """Load the prices and discounts last used with the tool, if they are stored and valid."""
+    prices_path, discounts_path = get_price_table_paths(storage, tool_code)
+    try:
+        temporary_day_prices = pl.read_parquet(prices_path)
+        permanent_discount = pl.read_parquet(discounts_path)
+        validate_prices(temporary_day_prices, permanent_discount, tool_code)
+    except (OSError, pl.exceptions.PolarsError, ValueError):
+        return None
+    return temporary_day_prices, permanent_discount
+
+
+@app.function
+async def save_price_tables(
+    storage: Path,
+    tool_code: str,
+    temporary_day_prices: pl.DataFrame,
+    permanent_discount: pl.DataFrame,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Store the prices and discounts of the tool, replacing the previous ones, and return them."""
+    prices_path, discounts_path = get_price_table_paths(storage, tool_code)
+    temporary_day_prices.write_parquet(prices_path)
+    permanent_discount.write_parquet(discounts_path)
+    await sync_prices_storage(from_browser=False)
+    return temporary_day_prices, permanent_discount
+
+
+@app.function
+async def save_uploaded_price_tables(
+    storage: Path,
+    tool_code: str,
+    prices_contents: bytes,
+    discounts_contents: bytes,
+    temporary_day_prices: pl.DataFrame,
+    permanent_discount: pl.DataFrame,
+) -> None:
+    """Store the prices and discounts read from the uploaded files, unless the same files were already stored.
+
+    Otherwise, every rerun while the files are uploaded would write them again, and
+    would replace the prices edited since they were uploaded.
+    """
+    upload = (
+        hashlib.blake2b(prices_contents).hexdigest(),
+        hashlib.blake2b(discounts_contents).hexdigest(),
+    )
+    if stored_uploads.get(tool_code) == upload:
+        return
+    await save_price_tables(
+        storage, tool_code, temporary_day_prices, permanent_discount
+    )
+    stored_uploads[tool_code] = upload
+
+
+@app.function
+async def clear_price_tables(storage: Path, tool_code: str) -> None:
+    """Remove the stored prices and discounts of the tool."""
+    for path in get_price_table_paths(storage, tool_code):
+        path.unlink(missing_ok=True)
+    # The uploaded files are stored again if they are still uploaded
+    stored_uploads.pop(tool_code, None)
+    await sync_prices_storage(from_browser=False)
+
+
+@app.function
+def compile_pricing_rules(
+    rules: PricingRules,
+    temporary_day_prices: pl.DataFrame,
+    permanent_discount: pl.DataFrame,
+) -> Callable[[pl.LazyFrame], pl.LazyFrame]:
+    """Compile the rules and tables of prices into a plan that prices the students.
+
+    The rules are converted into joins with the prices and discounts and a single
+    expression for each amount, which are only added to the plan of the data. The
+    prices are kept as they are written, and only each amount is rounded to cents.
+    """
+    rate_cols = [TYPE_COL] if rules.rate_col is not None else []
+    tier_cols = [MIN_DAYS_COL] if rules.day_price_tiers else []
+    price_cols = get_price_cols(rules)
+    # Also if the files are empty and have no numbers. The rates are joined as
+    # text, so that the categories of the export need no string cache shared with
+    # the ones of the prices
+    prices = (
+        temporary_day_prices.select(*rate_cols, *tier_cols, *price_cols)
+        .unique([*rate_cols, *tier_cols], keep="first", maintain_order=True)
+        .cast({col: pl.String for col in rate_cols})
+        .cast({col: pl.Float64 for col in [*tier_cols, *price_cols]})
+        .sort(tier_cols)
+    )
+    discounts = (
+        permanent_discount.select(*rate_cols, DISCOUNT_COL)
+        .unique(rate_cols or None, keep="first", maintain_order=True)
+        .cast({col: pl.String for col in rate_cols})
+        .cast({DISCOUNT_COL: pl.Float64})
+    )
+
+    category_code = get_category_code()
+    presence_days = pl.col(get_type_to_count(TEMPORARY_TYPE)).fill_null(0)
+    presence_price = presence_days * pl.col(PRICE_COL)
+    to_charge = presence_price
+    if rules.max_price:
+        to_charge = (
+            pl.when(pl.col(MAX_PRICE_COL) < presence_price)
+            .then(pl.col(MAX_PRICE_COL))
+            .otherwise(presence_price)
+        )
+    counted_days = pl.col(rules.discounted_type).fill_null(0)
+    if rules.min_days_to_discount is not None:
+        counted_days = (
+            pl.when(counted_days < rules.min_days_to_discount)
+            .then(counted_days)
+            .otherwise(0)
+        )
+    discount = to_cents(counted_days * pl.col(DISCOUNT_COL).fill_null(0))
+    refunds = -discount
+    if rules.replaced_price_col is not None:
+        refunds = discount - to_cents(
+            pl.when(counted_days != 0)
+            .then(pl.col(rules.replaced_price_col).fill_null(0))
+            .otherwise(0)
+        )
+
+    def join_rates(data: pl.LazyFrame, rates: pl.DataFrame) -> pl.LazyFrame:
+        if rules.rate_col is None:
+            # The same rate applies to all the students
+            first_rate = rates.row(0, named=True) if not rates.is_empty() else {}
+            return data.with_columns(
+                pl.lit(first_rate.get(col), dtype=dtype).alias(col)
+                for col, dtype in rates.schema.items()
+            )
+        return data.join(rates.lazy(), on=TYPE_COL, how="left", maintain_order="left")
+
+    def price(data: pl.LazyFrame) -> pl.LazyFrame:
+        if rules.rate_col is not None:
+            data = data.with_columns(
+                pl.col(rules.rate_col).cast(pl.String).alias(TYPE_COL)
+            )
+        if rules.day_price_tiers:
+            # Find the price of the highest tier reached by the days that each
+            # student has stayed, with an as-of join on the tiers sorted by days
+            data = (
+                data.with_row_index(ROW_INDEX_COL)
+                .with_columns(presence_days.cast(pl.Float64).alias(N_DAYS_COL))
+                .sort(N_DAYS_COL)
+                .join_asof(
+                    prices.lazy(),
+                    left_on=N_DAYS_COL,
+                    right_on=MIN_DAYS_COL,
+                    by=rate_cols[0] if rate_cols else None,
+                    strategy="backward",
+                )
+                .sort(ROW_INDEX_COL)
+            )
+        else:
+            data = join_rates(data, prices)
+        return (
+            join_rates(data, discounts)
+            .with_columns(
+                pl.when(category_code == TEMPORARY_TYPE)
+                # In case the student has not come or the rate has no price
+                .then(to_cents(to_charge.fill_null(0)))
+                .alias(TO_CHARGE_COL),
+                pl.when(category_code == PERMANENT_TYPE)
+                .then(refunds)
+                .alias(REFUNDS_COL),
+            )
+            .drop(
+                ROW_INDEX_COL,
+                N_DAYS_COL,
+                *rate_cols,
+                *tier_cols,
+                *price_cols,
+                DISCOUNT_COL,
+                strict=False,
+            )
+        )
+
+    return price
+
+
+@app.function
+def calculate_prices(
+    grouped_data: pl.LazyFrame,
+    temporary_day_prices: pl.DataFrame,
+    permanent_discount: pl.DataFrame,
+    tool_code: str,
+    min_days_to_discount: int = MIN_DAYS_TO_DISCOUNT,
+) -> pl.LazyFrame:
+    """Add the price (Cobrar) and discount (Devolucions) of each student in cents."""
+    price = compile_pricing_rules(
+        get_pricing_rules(tool_code, min_days_to_discount),
+        temporary_day_prices,
+        permanent_discount,
+    )
+    return price(grouped_data)
+
+
+@app.function
+def summarize_attendance(
+    data: pl.LazyFrame,
+    temporary_day_prices: pl.DataFrame,
+    permanent_discount: pl.DataFrame,
+    tool_code: str,
+    min_days_to_discount: int = MIN_DAYS_TO_DISCOUNT,
+    engine: Literal["auto", "in-memory", "streaming"] = "auto",
+) -> pl.DataFrame:
+    """Group, count and price an attendance export according to school rules.
+
+    The whole process is planned before running it, so that it can be run with the
+    streaming engine for big exports.
+    """
+    return calculate_prices(
+        group_attendance(data, get_pricing_rules(tool_code)),
+        temporary_day_prices,
+        permanent_discount,
+        tool_code,
+        min_days_to_discount,
+    ).collect(engine=engine)
+
+
+@app.function
+def get_summary_file_name(
+    export: AttendanceExport, export_format: str = CSV_FORMAT
+) -> str:
+    """Name the summary after the rate in the export and the month of its dates."""
+    extension = EXPORT_FORMATS[export_format]["extension"]
+    suffix = EXPORT_FORMATS[export_format].get("suffix", "")
+    return f"{export.rate}_{MONTH_NAMES[export.month_number]}{suffix}.{extension}"
+
+
+@app.function
+def format_summary(summary: pl.DataFrame) -> pl.DataFrame:
+    """Show the amounts of the summary in euros, with comma as decimal separator."""
+    return summary.with_columns(
+        format_cents(pl.col(col)).alias(col) for col in [TO_CHARGE_COL, REFUNDS_COL]
     )
 
-    def is_unique_tool_selected() -> bool:
-        return tool_selection.value == UNIQUE_TOOL_LABEL
 
+@app.function
+def to_euros(cents: pl.Expr) -> pl.Expr:
+    # Decimals keep the amounts exact, unlike dividing them as floats
+    return (cents.cast(pl.Decimal(scale=2)) / 100).cast(pl.Decimal(scale=2))
+
+
+@app.function
+def write_csv_summary(summary: pl.DataFrame, buffer: io.BytesIO) -> None:
+    # Polars can only write UTF-8, so encode the CSV by chunks of rows to avoid
+    # having the whole text and its encoded copy in memory at the same time
+    formatted_summary = format_summary(summary)
+    for offset in range(0, max(formatted_summary.height, 1), CSV_CHUNK_SIZE):
+        chunk = formatted_summary.slice(offset, CSV_CHUNK_SIZE)
+        buffer.write(
+            chunk.write_csv(separator=";", include_header=offset == 0).encode(ENCODING)
+        )
+
+
+@app.function
+def to_billing_import(
+    summary: pl.DataFrame, concepts: dict[str, str] = BILLING_CONCEPTS
+) -> pl.DataFrame:
+    """Reshape the summary into the layout of the importer, with a row per student and a column per billable concept.
+
+    The amounts of each student are added up by concept, e.g. the ones of each
+    category, and written as in the CSV summary. Amounts without a concept or a
+    value are left out, so that the importer does not change them.
+    """
+    if not concepts:
+        raise ValueError("There are no billable concepts to import")
+    amounts = (
+        summary.unpivot(
+            on=list(concepts),
+            index=STUDENT_NAME_COL,
+            variable_name=BILLING_NAME_COL,
+            value_name=PRICE_COL,
+        )
+        .drop_nulls(PRICE_COL)
+        .with_columns(pl.col(BILLING_NAME_COL).replace_strict(concepts))
+        .pivot(
+            on=BILLING_NAME_COL,
+            index=STUDENT_NAME_COL,
+            values=PRICE_COL,
+            aggregate_function="sum",
+            maintain_order=True,
+        )
+    )
+    # Keep every concept, even if no student has an amount of it
+    return amounts.select(
+        pl.col(STUDENT_NAME_COL).alias(BILLING_NAME_COL),
+        *(
+            format_cents(pl.col(concept)).alias(concept)
+            if concept in amounts.columns
+            else pl.lit(None, pl.String).alias(concept)
+            for concept in dict.fromkeys(concepts.values())
+        ),
+    )
+
+
+@app.function
+def summarize_levels(summary: pl.DataFrame) -> pl.DataFrame:
+    """Count the students, attendance and amounts of each level and of the whole summary."""
+    counted_cols = [col for col in ATTENDANCE_PRIORITY if col in summary.columns]
+    totals = summary.group_by(
+        pl.col(LEVEL_COL).cast(pl.String), maintain_order=True
+    ).agg(
+        pl.col(STUDENT_NAME_COL).n_unique().alias(N_STUDENTS_COL),
+        pl.col(*counted_cols, TO_CHARGE_COL, REFUNDS_COL).sum(),
+    )
+    return pl.concat(
+        [
+            totals,
+            summary.select(
+                pl.lit(TOTALS_SHEET).alias(LEVEL_COL),
+                pl.col(STUDENT_NAME_COL).n_unique().alias(N_STUDENTS_COL),
+                pl.col(*counted_cols, TO_CHARGE_COL, REFUNDS_COL).sum(),
+            ),
+        ]
+    )
+
+
+@app.function
+async def install_excel_writer() -> None:
+    # The writer of Excel is not loaded when the app starts, so that it starts
+    # faster, but only installed in the browser when an Excel is downloaded
+    if sys.platform == "emscripten":
+        import micropip
+
+        await micropip.install("xlsxwriter")
+
+
+@app.function
+def write_excel_summary(summary: pl.DataFrame, buffer: io.BytesIO) -> None:
+    # Write every sheet into the same workbook, which Polars leaves open
+    from xlsxwriter import Workbook
+
+    amount_formats: dict[Any, str] = {
+        TO_CHARGE_COL: "#,##0.00",
+        REFUNDS_COL: "#,##0.00",
+    }
+    excel_summary = summary.with_columns(
+        pl.col(TO_CHARGE_COL, REFUNDS_COL) / 100, pl.col(pl.Enum).cast(pl.String)
+    )
+    with Workbook(buffer) as workbook:
+        for (level,), level_summary in excel_summary.group_by(
+            LEVEL_COL, maintain_order=True
+        ):
+            level_summary.write_excel(
+                workbook,
+                # Excel does not allow some characters nor more than 31 in a sheet name
+                worksheet=re.sub(r"[\[\]:*?/\\]", "-", str(level))[:31],
+                column_formats=amount_formats,
+                autofit=True,
+            )
+        summarize_levels(summary).with_columns(
+            pl.col(TO_CHARGE_COL, REFUNDS_COL) / 100
+        ).write_excel(
+            workbook,
+            worksheet=TOTALS_SHEET,
+            column_formats=amount_formats,
+            autofit=True,
+        )
+
+
+@app.function
+def write_summary(
+    summary: pl.DataFrame,
+    export_format: str = CSV_FORMAT,
+    concepts: dict[str, str] = BILLING_CONCEPTS,
+) -> bytes:
+    """Write the summary in the given format, the CSV having the same format as the exports.
+
+    The Excel has a sheet for each level and another one with the totals, while
+    Parquet and Arrow IPC keep the types of the columns, with the amounts as decimals.
+    The import into Clickedu has the amounts of each student as the given billable
+    concepts, ready for the importer.
+    """
+    buffer = io.BytesIO()
+    if export_format == CSV_FORMAT:
+        write_csv_summary(summary, buffer)
+    elif export_format == IMPORT_FORMAT:
+        buffer.write(
+            to_billing_import(summary, concepts)
+            .write_csv(separator=";")
+            .encode(ENCODING)
+        )
+    elif export_format == EXCEL_FORMAT:
+        write_excel_summary(summary, buffer)
+    elif export_format == PARQUET_FORMAT:
+        summary.with_columns(
+            to_euros(pl.col(TO_CHARGE_COL, REFUNDS_COL))
+        ).write_parquet(buffer)
+    elif export_format == ARROW_FORMAT:
+        summary.with_columns(to_euros(pl.col(TO_CHARGE_COL, REFUNDS_COL))).write_ipc(
+            buffer
+        )
+    else:
+        raise ValueError(f"Unknown format {export_format}")
+    return buffer.getvalue()
+
+
+@app.cell
+def _():
+    import marimo as mo  # Recommended by Marimo to be imported as first and only
+
+    return (mo,)
+
+
+@app.cell
+def _(mo):
+    # Define necessary constants
+    TITLE_TEMPORARY_PRICE = (
+        "**Introduïu els preus en funció dels dies que s'ha quedat l'alumne:**"
+    )
+    TEMPORARY_PRICE_LABEL = "Preu (en €) per >{min_days} dies:"
+    TITLE_TEMPORARY_MAX_PRICE = "**Introduïu el preu màxim per alumnes puntuals:**"
+    TITLE_PERMANENT_PRICE = "**Introduïu el descompte per faltar un dia:**"
+    PERMANENT_PRICE_LABEL = "Descompte{type} (en €, serà considerat negatiu):"
+    TITLE_MIN_DAYS_TO_DISCOUNT = (
+        "**Introduïu el mínim nombre de dies per començar a descomptar absències:**"
+    )
+    SAVE_LABEL = "Utilitza els preus i descomptes modificats"
+    MAIN_FILE_LABEL = "Selecciona el fitxer amb les files per agrupar:"
+    DOWNLOAD_LABEL = "Descarrega el resum"
+    EXPORT_FORMAT_LABEL = "Format del fitxer:"
+    BILLING_CONCEPT_LABEL = "Concepte de Clickedu per «{amount}»:"
+    PRICE_LABEL = "Selecciona el fitxer amb els preus (alumnes puntuals):"
+    DISCOUNT_LABEL = (
+        "Selecciona el fitxer amb els descomptes per faltes (alumnes permanents):"
+    )
+    MIN_DAYS_TO_DISCOUNT_LABEL = "Mínim de dies:"
+    MEASURES_TITLE = "Temps i memòria de cada pas"
+    MEASURES_DOWNLOAD_LABEL = "Descarrega les mesures (JSON)"
+    NO_PRICES_MESSAGE = "Selecciona els fitxers amb els preus i els descomptes. Es desaran al navegador per a les properes vegades."
+    STORED_PRICES_MESSAGE = "Es fan servir els preus i descomptes desats al navegador. Selecciona uns altres fitxers per substituir-los."
+    CLEAR_PRICES_LABEL = "Oblida els preus i descomptes desats"
+    PRICES_CLEARED_MESSAGE = "S'han oblidat els preus i descomptes desats."
+
+    # The value of the selection is the code of the tool, which its rules and
+    # stored prices are found by
+    tool_selection = mo.ui.radio(
+        options={tool["label"]: tool["code"] for tool in TOOLS},
+        inline=True,
+    )
     tool_selection
     return (
-        CATEGORIES,
-        CATEGORY_COL,
-        COLS_TO_BE_REMOVED,
-        DISCOUNT_COL,
+        BILLING_CONCEPT_LABEL,
+        CLEAR_PRICES_LABEL,
         DISCOUNT_LABEL,
         DOWNLOAD_LABEL,
-        ENCODING,
-        FILE_NAME_COL,
-        LEVEL_COL,
+        EXPORT_FORMAT_LABEL,
         MAIN_FILE_LABEL,
-        MAX_PRICE_COL,
-        MIN_DAYS_TO_DISCOUNT,
+        MEASURES_DOWNLOAD_LABEL,
+        MEASURES_TITLE,
         MIN_DAYS_TO_DISCOUNT_LABEL,
-        N_ROWS_WITHOUT_RAW_DATA,
+        NO_PRICES_MESSAGE,
         PERMANENT_PRICE_LABEL,
-        PERMANENT_TYPE,
-        PRICE_COL,
+        PRICES_CLEARED_MESSAGE,
         PRICE_LABEL,
         SAVE_LABEL,
-        STUDENT_NAME_COL,
+        STORED_PRICES_MESSAGE,
         TEMPORARY_PRICE_LABEL,
-        TEMPORARY_TYPE,
         TITLE_MIN_DAYS_TO_DISCOUNT,
         TITLE_PERMANENT_PRICE,
         TITLE_TEMPORARY_MAX_PRICE,
         TITLE_TEMPORARY_PRICE,
-        YEAR_COL,
-        is_unique_tool_selected,
         tool_selection,
     )
 
@@ -142,67 +1125,109 @@ def _(DISCOUNT_LABEL, mo):
     return (discounts,)
 
 
+@app.cell
+async def _():
+    prices_storage = await open_prices_storage()
+    return (prices_storage,)
+
+
+@app.cell
+def _(CLEAR_PRICES_LABEL, mo):
+    clear_prices_button = mo.ui.run_button(kind="danger", label=CLEAR_PRICES_LABEL)
+    return (clear_prices_button,)
+
+
+@app.cell
+async def _(
+    NO_PRICES_MESSAGE,
+    PRICES_CLEARED_MESSAGE,
+    STORED_PRICES_MESSAGE,
+    clear_prices_button,
+    discounts,
+    mo,
+    prices,
+    prices_storage,
+    tool_selection,
+):
+    # Prevent displaying any value depending on the selection of the tool
+    mo.stop(tool_selection.value is None)
+
+    if clear_prices_button.value:
+        await clear_price_tables(prices_storage, tool_selection.value)
+        mo.stop(True, mo.callout(mo.md(PRICES_CLEARED_MESSAGE), kind="info"))
+    # The selected files replace the stored prices, which are used otherwise
+    if prices.value and discounts.value:
+        temporary_day_prices, permanent_discount = read_cached(
+            read_prices,
+            prices.contents(),
+            discounts.contents(),
+            tool_selection.value,
+        )
+        validate_prices(temporary_day_prices, permanent_discount, tool_selection.value)
+        await save_uploaded_price_tables(
+            prices_storage,
+            tool_selection.value,
+            prices.contents(),
+            discounts.contents(),
+            temporary_day_prices,
+            permanent_discount,
+        )
+        prices_source = None
+    else:
+        stored_prices = load_price_tables(prices_storage, tool_selection.value)
+        mo.stop(
+            stored_prices is None, mo.callout(mo.md(NO_PRICES_MESSAGE), kind="warn")
+        )
+        temporary_day_prices, permanent_discount = stored_prices
+        prices_source = mo.hstack(
+            [mo.md(STORED_PRICES_MESSAGE), clear_prices_button], justify="start"
+        )
+    prices_source
+    return permanent_discount, temporary_day_prices
+
+
 @app.cell
 def _(
-    DISCOUNT_COL,
-    MAX_PRICE_COL,
-    MIN_DAYS_TO_DISCOUNT,
     MIN_DAYS_TO_DISCOUNT_LABEL,
     PERMANENT_PRICE_LABEL,
-    PRICE_COL,
     SAVE_LABEL,
     TEMPORARY_PRICE_LABEL,
     TITLE_MIN_DAYS_TO_DISCOUNT,
     TITLE_PERMANENT_PRICE,
     TITLE_TEMPORARY_MAX_PRICE,
     TITLE_TEMPORARY_PRICE,
-    discounts,
-    is_unique_tool_selected,
     mo,
-    pl,
-    prices,
+    permanent_discount,
+    temporary_day_prices,
     tool_selection,
 ):
-    # Prevent displaying any value depending on the selection of the tool
-    mo.stop(tool_selection.value is None)
+    # Display the prices and allowing updating them according to the rules of the tool and concrete formatting of the input file
+    pricing_rules = get_pricing_rules(tool_selection.value)
 
-    # Display the prices and allowing updating them according to the tool and concrete formatting of the input file
-    if is_unique_tool_selected():
-        SORTING_COL = "min_days"
-        IS_DESCENDING_SORT = True
-    else:
-        SORTING_COL = "type"
-        IS_DESCENDING_SORT = False
+    def get_price_label(limit: dict[str, Any]) -> str:
+        return (
+            TEMPORARY_PRICE_LABEL.format(min_days=limit[MIN_DAYS_COL])
+            if pricing_rules.day_price_tiers
+            else f"{limit[TYPE_COL]}:"
+        )
 
     # Generate all the elements
-    temporary_day_prices = pl.read_csv(prices.contents(), separator=";").sort(
-        by=SORTING_COL, descending=IS_DESCENDING_SORT
-    )
-    permanent_discount = pl.read_csv(discounts.contents(), separator=";")
-    if not is_unique_tool_selected():
-        permanent_discount = permanent_discount.sort(
-            by=SORTING_COL, descending=IS_DESCENDING_SORT
-        )
     fields = []
     max_price_fields = []
     for limit in temporary_day_prices.iter_rows(named=True):
         input = mo.ui.number(
             start=0,
             value=limit[PRICE_COL],
-            label=TEMPORARY_PRICE_LABEL.format(min_days=limit[SORTING_COL])
-            if is_unique_tool_selected()
-            else f"{limit[SORTING_COL]}:",
+            label=get_price_label(limit),
         )
         fields.append(input)
         max_price_input = (
             mo.ui.number(
                 start=0,
                 value=limit[MAX_PRICE_COL],
-                label=TEMPORARY_PRICE_LABEL.format(min_days=limit[SORTING_COL])
-                if is_unique_tool_selected()
-                else f"{limit[SORTING_COL]}:",
+                label=get_price_label(limit),
             )
-            if not is_unique_tool_selected()
+            if pricing_rules.max_price
             else ""
         )
         max_price_fields.append(max_price_input)
@@ -212,10 +1237,8 @@ def _(
             start=0,
             value=limit[DISCOUNT_COL],
             label=PERMANENT_PRICE_LABEL.format(type="")
-            if is_unique_tool_selected()
-            else PERMANENT_PRICE_LABEL.format(
-                type=f" per {limit[SORTING_COL].lower()}"
-            ),
+            if pricing_rules.rate_col is None
+            else PERMANENT_PRICE_LABEL.format(type=f" per {limit[TYPE_COL].lower()}"),
         )
         discount_fields.append(discount_input)
     min_days_to_discount = (
@@ -224,7 +1247,7 @@ def _(
             value=MIN_DAYS_TO_DISCOUNT,
             label=MIN_DAYS_TO_DISCOUNT_LABEL,
         )
-        if not is_unique_tool_selected()
+        if pricing_rules.min_days_to_discount is not None
         else ""
     )
     edit_button = mo.ui.run_button(kind="success", label=SAVE_LABEL)
@@ -234,11 +1257,15 @@ def _(
         [
             mo.md(text=TITLE_TEMPORARY_PRICE),
             *fields,
-            mo.md(text="" if is_unique_tool_selected() else TITLE_TEMPORARY_MAX_PRICE),
+            mo.md(text=TITLE_TEMPORARY_MAX_PRICE if pricing_rules.max_price else ""),
             *max_price_fields,
             mo.md(text=TITLE_PERMANENT_PRICE),
             *discount_fields,
-            mo.md(text="" if is_unique_tool_selected() else TITLE_MIN_DAYS_TO_DISCOUNT),
+            mo.md(
+                text=TITLE_MIN_DAYS_TO_DISCOUNT
+                if pricing_rules.min_days_to_discount is not None
+                else ""
+            ),
             min_days_to_discount,
             edit_button,
         ]
@@ -248,35 +1275,40 @@ def _(
         edit_button,
         fields,
         min_days_to_discount,
-        permanent_discount,
-        temporary_day_prices,
+        pricing_rules,
     )
 
 
 @app.cell
-def _(
-    DISCOUNT_COL,
-    PRICE_COL,
+async def _(
     discount_fields,
     edit_button,
     fields,
-    mo,
     permanent_discount,
-    pl,
+    prices_storage,
     temporary_day_prices,
+    tool_selection,
 ):
-    # Callback for Edit button. Block the execution until button is clicked
-    mo.stop(not edit_button.value)
-
-    temporary_day_prices.replace_column(
-        temporary_day_prices.columns.index(PRICE_COL),
-        pl.Series(PRICE_COL, list(map(lambda input: input.value, fields))),
-    )
-    permanent_discount.replace_column(
-        permanent_discount.columns.index(DISCOUNT_COL),
-        pl.Series(DISCOUNT_COL, list(map(lambda input: input.value, discount_fields))),
-    )
-    return
+    # Callback for Edit button. Until it is clicked, use the prices from the files.
+    # Only the prices of the summary are calculated again when it changes
+    if edit_button.value:
+        # Keep the modified prices for the next sessions too
+        saved_day_prices, saved_discount = await save_price_tables(
+            prices_storage,
+            tool_selection.value,
+            temporary_day_prices.with_columns(
+                pl.Series(PRICE_COL, list(map(lambda input: input.value, fields)))
+            ),
+            permanent_discount.with_columns(
+                pl.Series(
+                    DISCOUNT_COL, list(map(lambda input: input.value, discount_fields))
+                )
+            ),
+        )
+    else:
+        saved_day_prices = temporary_day_prices
+        saved_discount = permanent_discount
+    return saved_day_prices, saved_discount
 
 
 @app.cell
@@ -294,299 +1326,146 @@ def _(MAIN_FILE_LABEL, mo, tool_selection):
 
 
 @app.cell
-def _(
-    CATEGORIES,
-    CATEGORY_COL,
-    COLS_TO_BE_REMOVED,
-    DISCOUNT_COL,
-    ENCODING,
-    FILE_NAME_COL,
-    LEVEL_COL,
-    MAX_PRICE_COL,
-    N_ROWS_WITHOUT_RAW_DATA,
-    PERMANENT_TYPE,
-    PRICE_COL,
-    STUDENT_NAME_COL,
-    TEMPORARY_TYPE,
-    YEAR_COL,
-    file,
-    is_unique_tool_selected,
-    min_days_to_discount,
-    mo,
-    np,
-    permanent_discount,
-    pl,
-    temporary_day_prices,
-):
+def _(file, mo, tool_selection):
     # Prevent running the cell if all the necessary files are not present
     mo.stop(file.name() is None)
 
-    # Define necessary auxiliary functions
-    def count_row_values(values: dict) -> dict[str, int]:
-        counts = np.unique_counts(list(values.values()))
-        return dict(zip(counts.values, counts.counts))
-
-    def _get_struct_cols(selected_type: int) -> list[str]:
-        cols = [
-            CATEGORY_COL,
-            next(
-                filter(
-                    lambda category: category["code"] == selected_type,
-                    CATEGORIES.values(),
-                ),
-                {"type_to_count": ""},
-            )["type_to_count"],
-        ]
-        if not is_unique_tool_selected():
-            cols.append(FILE_NAME_COL)
-        return cols
+    # Keep the counts apart, since they do not depend on the prices
+    export, read_measure = measure_stage(
+        "read", lambda: read_cached(read_attendance, file.contents())
+    )
+    counted_data, group_measure = measure_stage(
+        "group",
+        lambda: group_attendance(
+            export.data.lazy(), get_pricing_rules(tool_selection.value)
+        ).collect(),
+        export.data.height,
+    )
+    return counted_data, export, group_measure, read_measure
 
-    def _price_for_unique(price_info: dict[str, int | float], n_days: int) -> float:
-        return n_days >= price_info["min_days"]
 
-    def _price_for_category(price_info: dict[str, int | float], category: str) -> float:
-        return price_info["type"] == category
+@app.cell
+def _(
+    counted_data,
+    min_days_to_discount,
+    pricing_rules,
+    saved_day_prices,
+    saved_discount,
+    tool_selection,
+):
+    grouped_data, price_measure = measure_stage(
+        "price",
+        lambda: calculate_prices(
+            counted_data.lazy(),
+            saved_day_prices,
+            saved_discount,
+            tool_selection.value,
+            MIN_DAYS_TO_DISCOUNT
+            if pricing_rules.min_days_to_discount is None
+            else min_days_to_discount.value,
+        ).collect(),
+        counted_data.height,
+    )
 
-    def calculate_presence_price_in_temporary(category_and_days: dict) -> str:
-        if (
-            category_and_days[CATEGORY_COL] not in CATEGORIES
-            or CATEGORIES[category_and_days[CATEGORY_COL]]["code"] != TEMPORARY_TYPE
-        ):
-            return ""
-        n_days = (
-            category_and_days.get(
-                CATEGORIES[category_and_days[CATEGORY_COL]]["type_to_count"]
-            )
-            or 0
-        )
-        price_info = next(
-            filter(
-                lambda price_info: _price_for_unique(price_info, n_days)
-                if is_unique_tool_selected()
-                else _price_for_category(
-                    price_info,
-                    category_and_days[
-                        CATEGORY_COL if is_unique_tool_selected() else FILE_NAME_COL
-                    ],
-                ),
-                temporary_day_prices.iter_rows(named=True),
-            ),
-            {
-                PRICE_COL: 0
-            },  # In case the student has not attended during the whole month
-        )
-        return str(
-            round(
-                min(
-                    n_days * price_info[PRICE_COL],
-                    price_info.get(MAX_PRICE_COL, float("inf")),
-                ),
-                2,
-            )
-        ).replace(
-            ".", ","
-        )  # Use comma as decimal separator, since current Polars version cannot handle it
-
-    def calculate_absence_discount_in_permanent(category_and_days: dict) -> str:
-        if (
-            category_and_days[CATEGORY_COL] not in CATEGORIES
-            or CATEGORIES[category_and_days[CATEGORY_COL]]["code"] != PERMANENT_TYPE
-        ):
-            return ""
-        n_days = (
-            category_and_days.get(
-                next(
-                    filter(
-                        lambda key: key not in [CATEGORY_COL, FILE_NAME_COL],
-                        category_and_days.keys(),
-                    )
-                )
-            )
-            or 0
-        )
-        normal_price_for_category = 0  # Number of missing days are counted for the unique tool so nothing is to be subtracted
-        if (
-            not is_unique_tool_selected()
-        ):  # Discount if the student has not come as many days as minimum expected
-            n_days = n_days if min_days_to_discount.value > n_days else 0
-            normal_price_for_category = (
-                0
-                if n_days == 0
-                else next(
-                    filter(
-                        lambda price_info: _price_for_category(
-                            price_info,
-                            category_and_days[FILE_NAME_COL],
-                        ),
-                        temporary_day_prices.iter_rows(named=True),
-                    ),
-                    {
-                        MAX_PRICE_COL: 0
-                    },  # In case the student has not attended during the whole month
-                )[MAX_PRICE_COL]
-            )
-        return str(
-            round(
-                n_days
-                * (-1 if is_unique_tool_selected() else 1)
-                * next(
-                    filter(
-                        # Return the single line of the unique tool or find the one for the corresponding category
-                        lambda price_info: price_info
-                        if is_unique_tool_selected()
-                        else _price_for_category(
-                            price_info,
-                            category_and_days[
-                                CATEGORY_COL
-                                if is_unique_tool_selected()
-                                else FILE_NAME_COL
-                            ],
-                        ),
-                        permanent_discount.iter_rows(named=True),
-                    ),
-                    {
-                        DISCOUNT_COL: 0
-                    },  # In case the student has not attended during the whole month
-                )[DISCOUNT_COL],
-                2,
-            )
-            - normal_price_for_category
-        ).replace(
-            ".", ","
-        )  # Use comma as decimal separator, since current Polars version cannot handle it
-
-    # Read as DF and format as expected
-    if not is_unique_tool_selected() and FILE_NAME_COL in COLS_TO_BE_REMOVED:
-        COLS_TO_BE_REMOVED.remove(
-            FILE_NAME_COL
-        )  # Do not remove the column with information about the subcategory
-    data = (
-        pl.read_csv(file.contents(), encoding=ENCODING, separator=";")
-        .limit(-N_ROWS_WITHOUT_RAW_DATA)
-        .drop(COLS_TO_BE_REMOVED, strict=False)
-    )
-    value_columns = list(data.columns)
-    if STUDENT_NAME_COL in value_columns:
-        value_columns.remove(STUDENT_NAME_COL)
-    if YEAR_COL in value_columns:
-        value_columns.remove(YEAR_COL)
+    format_summary(grouped_data)
+    return grouped_data, price_measure
 
-    SORTING_COLS = (
-        [LEVEL_COL, CATEGORY_COL, STUDENT_NAME_COL]
-        if is_unique_tool_selected()
-        else [LEVEL_COL, STUDENT_NAME_COL, CATEGORY_COL, FILE_NAME_COL]
+
+@app.cell
+def _(EXPORT_FORMAT_LABEL, mo):
+    export_format = mo.ui.dropdown(
+        options=list(EXPORT_FORMATS), value=CSV_FORMAT, label=EXPORT_FORMAT_LABEL
     )
-    other_than_date_cols = [CATEGORY_COL, FILE_NAME_COL]
-    cols_to_group_by = [STUDENT_NAME_COL]
-    if is_unique_tool_selected():
-        cols_to_group_by.append(CATEGORY_COL)
-        value_columns.remove(CATEGORY_COL)
-    else:
-        cols_to_group_by.append(FILE_NAME_COL)
-        value_columns.remove(FILE_NAME_COL)
-
-    # Use the sorting functionality of np.unique to get the 'P', which is the last
-    # possible value if present and has highest priority. It also works for the
-    # categories, since if both are present ('puntual' and 'permanent'), 'puntual'
-    # (the last in alphabetic order) is wanted. For the year column, all the rows
-    # per student should have the same, so it is enough selecting the first.
-    # Then add up the corresponding type (A/P) based on the category
-    # (puntual/permanent) and get the correct price or discount
-    grouped_data = (
-        data.group_by(cols_to_group_by, maintain_order=True)
-        .agg(
-            # Generate the level column
-            [
-                pl.map_groups(
-                    exprs=YEAR_COL,
-                    function=lambda years: np.unique(years)[0].split(" / ", 1)[0],
-                    return_dtype=pl.datatypes.String,
-                    returns_scalar=True,
-                ).alias(LEVEL_COL)
-            ]
-            # If more than one row within the category,
-            # select the type with highest priority (last)
-            + [
-                pl.map_groups(
-                    exprs=col,
-                    function=lambda values: np.unique(values)[-1],
-                    return_dtype=pl.datatypes.String,
-                    returns_scalar=True,
-                )
-                for col in value_columns
-            ]
-        )
-        # Convert the level column to categorical to be able to keep the logical order
-        .with_columns(pl.col(LEVEL_COL).cast(pl.datatypes.Categorical))
-        .sort(by=pl.col(SORTING_COLS))
-        # Calculate the subtotals of each type and get each in a separate column
-        .with_columns(
-            Recompte=pl.struct(
-                # i.e. include only the date columns
-                pl.col(
-                    filter(lambda col: col not in other_than_date_cols, value_columns)
-                )
-            ).map_elements(
-                count_row_values,
-                return_dtype=pl.Struct(
-                    [pl.Field("-", pl.Int64)]
-                    + [
-                        pl.Field(category, pl.Int64)
-                        for category in map(
-                            lambda category: category["type_to_count"],
-                            CATEGORIES.values(),
-                        )
-                    ]
-                ),
+    export_format
+    return (export_format,)
+
+
+@app.cell
+def _(BILLING_CONCEPT_LABEL, export_format, mo):
+    # Only needed to import the summary into Clickedu
+    billing_concepts = mo.ui.dictionary(
+        {
+            amount_col: mo.ui.text(
+                value=concept, label=BILLING_CONCEPT_LABEL.format(amount=amount_col)
             )
-        )
-        .unnest("Recompte")
-        # Calculate the prices and discounts according to school rules
-        .with_columns(
-            Cobrar=pl.struct(_get_struct_cols(TEMPORARY_TYPE)).map_elements(
-                calculate_presence_price_in_temporary, return_dtype=str
-            ),
-            Devolucions=pl.struct(
-                _get_struct_cols(
-                    PERMANENT_TYPE if is_unique_tool_selected() else TEMPORARY_TYPE
-                )
-            ).map_elements(calculate_absence_discount_in_permanent, return_dtype=str),
-        )
+            for amount_col, concept in BILLING_CONCEPTS.items()
+        }
     )
-
-    grouped_data
-    return (grouped_data,)
+    billing_concepts if export_format.value == IMPORT_FORMAT else None
+    return (billing_concepts,)
 
 
 @app.cell
-def _(
-    CATEGORY_COL,
+async def _(
     DOWNLOAD_LABEL,
-    ENCODING,
-    FILE_NAME_COL,
-    LEVEL_COL,
-    STUDENT_NAME_COL,
-    calendar,
-    file,
+    billing_concepts,
+    export,
+    export_format,
     grouped_data,
     mo,
-    pl,
 ):
-    base_file_name = pl.read_csv(
-        file.contents(), encoding=ENCODING, separator=";", n_rows=1
-    )[FILE_NAME_COL][0]
-    non_month_cols = [STUDENT_NAME_COL, CATEGORY_COL, LEVEL_COL, FILE_NAME_COL]
-    month_number = int(
-        grouped_data.drop(non_month_cols).columns[0].split("/")[1].split(" ")[0]
-    )
-    filename = f"{base_file_name}_{calendar.month_name[month_number]}.csv"
-    excel_download = mo.download(
-        data=grouped_data.write_csv(separator=";").encode(ENCODING),
-        filename=filename,
-        mimetype="text/csv",
+    if export_format.value == EXCEL_FORMAT:
+        await install_excel_writer()
+    summary, write_measure = measure_stage(
+        "write",
+        lambda: write_summary(
+            grouped_data,
+            export_format.value,
+            # Amounts without a concept are not imported
+            {
+                amount_col: concept
+                for amount_col, concept in billing_concepts.value.items()
+                if concept
+            },
+        ),
+        grouped_data.height,
+    )
+    summary_download = mo.download(
+        data=summary,
+        filename=get_summary_file_name(export, export_format.value),
+        mimetype=EXPORT_FORMATS[export_format.value]["mimetype"],
         label=DOWNLOAD_LABEL,
     )
-    excel_download
+    summary_download
+    return (write_measure,)
+
+
+@app.cell
+def _(
+    MEASURES_DOWNLOAD_LABEL,
+    MEASURES_TITLE,
+    export,
+    group_measure,
+    mo,
+    price_measure,
+    read_measure,
+    tool_selection,
+    write_measure,
+):
+    # Display the measures of the last run of each step, to find which one is slow
+    measures = [read_measure, group_measure, price_measure, write_measure]
+    measures_report = {
+        "tool": tool_selection.value,
+        "file": get_summary_file_name(export),
+        "stages": [asdict(measure) for measure in measures],
+    }
+    mo.accordion(
+        {
+            MEASURES_TITLE: mo.vstack(
+                [
+                    pl.DataFrame(measures_report["stages"]),
+                    mo.download(
+                        data=json.dumps(measures_report, indent=2).encode(),
+                        filename=get_summary_file_name(export).replace(
+                            ".csv", "_mesures.json"
+                        ),
+                        mimetype="application/json",
+                        label=MEASURES_DOWNLOAD_LABEL,
+                    ),
+                ]
+            )
+        }
+    )
     return
 
 
@@ -0,0 +1,147 @@
+"""
+Benchmark of how the resum app groups the rows of each student.
+
+This script compares grouping the attendance with the native aggregations of the app against calling np.unique for each group and column with map_groups, as the app did before, with synthetic exports of both tools, and checks that both keep the same values, also of a category that the app does not know.
+
+The script can be run from the root of the repository with the arguments:
+    uv run python -m benchmarks.benchmark_grouping [--students STUDENTS [STUDENTS ...]] [--days DAYS] [--repeats REPEATS]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import polars as pl
+
+from apps.resum import (
+    CATEGORIES,
+    CATEGORY_COL,
+    FILE_NAME_COL,
+    LEVEL_COL,
+    STUDENT_NAME_COL,
+    TOOLS,
+    YEAR_COL,
+    PricingRules,
+    get_pricing_rules,
+    group_attendance,
+    read_attendance,
+)
+from benchmarks.generate_attendance import TARIFFS, generate_attendance
+
+# Category that is not in the ones of the app, whose text has to be kept as well
+UNKNOWN_CATEGORY = "Inscripció esporàdica"
+
+
+def group_with_map_groups(data: pl.DataFrame, rules: PricingRules) -> pl.DataFrame:
+    # Grouping of the app before the native aggregations, which relies on the
+    # sorting of np.unique to keep the value with highest priority (the last)
+    if rules.rate_col is None:
+        data = data.drop(FILE_NAME_COL, strict=False)
+    cols_to_group_by = [STUDENT_NAME_COL, rules.rate_col or CATEGORY_COL]
+    value_columns = [
+        col for col in data.columns if col not in [YEAR_COL, *cols_to_group_by]
+    ]
+    return data.group_by(cols_to_group_by, maintain_order=True).agg(
+        [
+            pl.map_groups(
+                exprs=YEAR_COL,
+                function=lambda years: np.unique(years)[0].split(" / ", 1)[0],
+                return_dtype=pl.datatypes.String,
+                returns_scalar=True,
+            ).alias(LEVEL_COL)
+        ]
+        + [
+            pl.map_groups(
+                exprs=col,
+                function=lambda values: np.unique(values)[-1],
+                return_dtype=pl.datatypes.String,
+                returns_scalar=True,
+            )
+            for col in value_columns
+        ]
+    )
+
+
+def measure(run: Callable[[], Any], repeats: int) -> tuple[Any, float]:
+    """Run a grouping several times and return its result and best time."""
+    wall_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = run()
+        wall_times.append(time.perf_counter() - start)
+    return result, min(wall_times)
+
+
+def main(students: list[int], days: int = 22, repeats: int = 3) -> None:
+    """Runs the benchmark for both tools and prints the time of each grouping.
+
+    PARAMETERS
+    ----------
+    students : list[int]
+        Numbers of students of the exports
+    days : int
+        Number of school days of the exports
+    repeats : int
+        Number of times each grouping is run, keeping the best time
+    """
+    print(
+        f"{'Tool':<10}{'Students':>10}{'Rows':>10}{'map_groups (s)':>18}{'Native (s)':>14}"
+    )
+    for tool in TOOLS:
+        rules = get_pricing_rules(tool["code"])
+        for n_students in students:
+            data = read_attendance(
+                generate_attendance(
+                    n_students,
+                    days,
+                    TARIFFS[tool["label"]],
+                    categories=[*CATEGORIES, UNKNOWN_CATEGORY],
+                )
+            ).data
+            # The previous grouping read every column as text
+            text_data = data.with_columns(pl.all().cast(pl.String))
+            previous_groups, previous_time = measure(
+                lambda: group_with_map_groups(text_data, rules), repeats
+            )
+            groups, native_time = measure(
+                lambda: group_attendance(data.lazy(), rules).collect(),
+                repeats,
+            )
+            # The native grouping also sorts and counts the days, so only the
+            # grouped values are compared
+            sorting_cols = [STUDENT_NAME_COL, rules.rate_col or CATEGORY_COL]
+            if not previous_groups.sort(sorting_cols).equals(
+                groups.select(previous_groups.columns)
+                .cast(pl.String)
+                .sort(sorting_cols)
+            ):
+                raise RuntimeError(
+                    "The native grouping does not keep the same values as np.unique"
+                )
+            print(
+                f"{tool['label']:<10}{n_students:>10}{data.height:>10}{previous_time:>18.3f}{native_time:>14.4f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="Benchmark de l'agrupació del resum",
+        description="Compara com el resum agrupa les files de cada alumne",
+    )
+    parser.add_argument(
+        "--students",
+        type=int,
+        nargs="+",
+        default=[500, 2000, 8000],
+        help="Numbers of students of the exports",
+    )
+    parser.add_argument(
+        "--days", type=int, default=22, help="Number of school days of the exports"
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Times each grouping is run"
+    )
+    args = parser.parse_args()
+    main(args.students, args.days, args.repeats)
@@ -0,0 +1,216 @@
+"""
+Benchmark of the importer with local copies of the billing page of Clickedu.
+
+This script generates billing pages of several sizes and files to import into them, opens them from file:// in a headless Chrome and measures each phase of the importer (finding the billable fields in the page, matching them with the file, reading the current values and writing the new ones), so that its speed can be measured and checked without network nor login. After writing, the values of the page are read again to check that the import is right.
+
+The script can be run from the root of the repository with the arguments:
+    uv run --all-packages python -m benchmarks.benchmark_importer [--students STUDENTS [STUDENTS ...]] [--concepts CONCEPTS] [--changed-ratio CHANGED_RATIO] [--driver DRIVER] [--per-cell-sample PER_CELL_SAMPLE] [--output OUTPUT]
+
+A Chromedriver matching the installed Chrome is needed: it is downloaded if no path is given, which needs network the first time.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from benchmarks.benchmark_importer_index import load_importer
+from benchmarks.mock_clickedu import ENCODING, generate_mock
+
+PHASES = ["scan", "match", "diff", "write", "write_per_cell"]
+
+
+def measure(run: Callable[[], Any]) -> tuple[Any, float]:
+    """Run a phase without its messages and return its result and wall time in seconds."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = run()
+        return result, time.perf_counter() - start
+
+
+def run_case(
+    importer: Any,
+    n_students: int,
+    n_concepts: int,
+    changed_ratio: float,
+    driver_path: str | None,
+    per_cell_sample: int,
+) -> dict[str, Any]:
+    """Import a generated file into its page and measure each phase."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        page_path, import_path = generate_mock(
+            Path(output_dir), n_students, n_concepts, changed_ratio
+        )
+        data = pl.read_csv(import_path, separator=";", encoding=ENCODING)
+        driver = importer.open_browser(
+            page_path.resolve().as_uri(), headless=True, driver_path=driver_path
+        )
+        try:
+            importer.wait_for_billing_page(driver, timeout=60)
+            table = driver.find_element("id", importer.TABLE_ID)
+            wall_times = {}
+            billing_fields, wall_times["scan"] = measure(
+                lambda: importer.find_billing_fields(driver, table, data.columns)
+            )
+            billing_updates, wall_times["match"] = measure(
+                lambda: importer.find_billing_updates(
+                    data, importer.index_billing_fields(billing_fields)
+                )
+            )
+            changed_updates, wall_times["diff"] = measure(
+                lambda: importer.find_changed_updates(driver, billing_updates)
+            )
+            failed_updates, wall_times["write"] = measure(
+                lambda: importer.write_billing_values(driver, changed_updates)
+            )
+            # Check that the page has the values of the file, writing the ones the
+            # batches could not as the importer does
+            for field, value in failed_updates:
+                importer.write_billing_value(driver, field, value)
+            remaining_updates, _ = measure(
+                lambda: importer.find_changed_updates(driver, billing_updates)
+            )
+            if remaining_updates:
+                raise RuntimeError(
+                    f"{len(remaining_updates)} values were not imported correctly"
+                )
+
+            # Writing one by one is too slow for whole pages, so it is measured
+            # with a sample of the updates, restoring their previous values first
+            if per_cell_sample > 0 and changed_updates:
+                driver.refresh()
+                importer.wait_for_billing_page(driver, timeout=60)
+                table = driver.find_element("id", importer.TABLE_ID)
+                sample = importer.find_changed_updates(
+                    driver,
+                    importer.find_billing_updates(
+                        data,
+                        importer.index_billing_fields(
+                            importer.find_billing_fields(driver, table, data.columns)
+                        ),
+                    ),
+                )[:per_cell_sample]
+                _, sample_time = measure(
+                    lambda: [
+                        importer.write_billing_value(driver, field, value)
+                        for field, value in sample
+                    ]
+                )
+                # Extrapolate to all the updates
+                wall_times["write_per_cell"] = (
+                    sample_time / len(sample) * len(changed_updates)
+                )
+        finally:
+            driver.quit()
+    return {
+        "students": n_students,
+        "concepts": n_concepts,
+        "fields": len(billing_fields),
+        "updates": len(billing_updates),
+        "changed": len(changed_updates),
+        "failed": len(failed_updates),
+        "wall_times": wall_times,
+    }
+
+
+def main(
+    students: list[int],
+    concepts: int = 10,
+    changed_ratio: float = 1.0,
+    driver_path: str | None = None,
+    per_cell_sample: int = 0,
+    output: str | None = None,
+) -> None:
+    """Runs the benchmark for each number of students and prints the time of each phase.
+
+    PARAMETERS
+    ----------
+    students : list[int]
+        Numbers of students of the pages
+    concepts : int
+        Number of billable concepts of the pages
+    changed_ratio : float
+        Ratio of values of the file that are different from the page
+    driver_path : str | None
+        Path of the Chromedriver to use instead of downloading it
+    per_cell_sample : int
+        Number of values written one by one to estimate how long it takes for all of
+        them, or 0 not to measure it
+    output : str | None
+        Path of a JSON file to write the results into, e.g. to compare them later
+    """
+    importer = load_importer()
+    results = []
+    print(
+        f"{'Students':>10}{'Fields':>10}{'Changed':>10}  "
+        + "".join(f"{phase + ' (s)':>20}" for phase in PHASES)
+    )
+    for n_students in students:
+        result = run_case(
+            importer,
+            n_students,
+            concepts,
+            changed_ratio,
+            driver_path,
+            per_cell_sample,
+        )
+        results.append(result)
+        print(
+            f"{n_students:>10}{result['fields']:>10}{result['changed']:>10}  "
+            + "".join(
+                f"{result['wall_times'][phase]:>20.3f}"
+                if phase in result["wall_times"]
+                else f"{'-':>20}"
+                for phase in PHASES
+            )
+        )
+    if output is not None:
+        Path(output).write_text(json.dumps(results, indent=2))
+        print(f"Results written into {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="Benchmark de la importació",
+        description="Mesura cada pas de la importació amb còpies locals de la pàgina de Clickedu",
+    )
+    parser.add_argument(
+        "--students",
+        type=int,
+        nargs="+",
+        default=[100, 500],
+        help="Numbers of students",
+    )
+    parser.add_argument("--concepts", type=int, default=10, help="Number of concepts")
+    parser.add_argument(
+        "--changed-ratio",
+        type=float,
+        default=1.0,
+        help="Ratio of values of the file that are different from the page",
+    )
+    parser.add_argument(
+        "--driver", help="Path of the Chromedriver to use instead of downloading it"
+    )
+    parser.add_argument(
+        "--per-cell-sample",
+        type=int,
+        default=0,
+        help="Values written one by one to estimate the time of writing all of them so",
+    )
+    parser.add_argument("--output", help="JSON file to write the results into")
+    args = parser.parse_args()
+    main(
+        args.students,
+        args.concepts,
+        args.changed_ratio,
+        args.driver,
+        args.per_cell_sample,
+        args.output,
+    )
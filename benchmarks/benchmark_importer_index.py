@@ -0,0 +1,166 @@
+"""
+Benchmark of how the importer matches the values to import with the billable fields of the page.
+
+This script compares finding the field of each value with the index of the importer against filtering all the fields for each student and concept, as the importer did before, with synthetic fields of a whole school, so that no browser is needed.
+
+The script can be run from the root of the repository with the arguments:
+    uv run --all-packages python -m benchmarks.benchmark_importer_index [--students STUDENTS [STUDENTS ...]] [--concepts CONCEPTS] [--repeats REPEATS]
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import random
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import polars as pl
+
+IMPORTER_PATH = Path(__file__).parents[1] / "scripts" / "importació" / "importació.py"
+
+
+def load_importer() -> ModuleType:
+    # The importer is a script, which cannot be imported by its name
+    spec = importlib.util.spec_from_file_location("importacio", IMPORTER_PATH)
+    assert spec is not None and spec.loader is not None
+    importer = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(importer)
+    return importer
+
+
+def generate_billing(
+    importer: ModuleType, n_students: int, n_concepts: int, seed: int = 0
+) -> tuple[list[Any], pl.DataFrame]:
+    """Generates the fields of a page and the values to import, with some students and concepts missing."""
+    generator = random.Random(seed)
+    students = [f"Alumne {student}" for student in range(n_students)]
+    concepts = [f"Concepte {concept}" for concept in range(n_concepts)]
+    # The elements are not needed to match the fields
+    billing_fields = [
+        importer.BillingInformation(student, concept, None)
+        for student in students
+        for concept in concepts
+        if generator.random() < 0.95
+    ]
+    data = pl.DataFrame(
+        {
+            importer.NAME_COLUMN: students + ["Alumne nou"],
+            **{
+                concept: [
+                    generator.choice([None, 0.0, 1.0, 2.5])
+                    for _ in range(n_students + 1)
+                ]
+                for concept in concepts + ["Concepte nou"]
+            },
+        }
+    )
+    return billing_fields, data
+
+
+def find_billing_updates_linearly(
+    name_column: str, data: pl.DataFrame, billing_fields: list[Any]
+) -> list[tuple[Any, str]]:
+    # Matching of the importer before the index, filtering all the fields for
+    # each column, student and concept
+    clean_data = data[
+        :,
+        [
+            any(
+                map(
+                    lambda field: col == name_column or field.billing_item == col,
+                    billing_fields,
+                )
+            )
+            for col in data.columns
+        ],
+    ]
+    updates = []
+    for billing_info in clean_data.iter_rows(named=True):
+        student_fields = list(
+            filter(
+                lambda field: field.student == billing_info[name_column], billing_fields
+            )
+        )
+        if len(student_fields) == 0:
+            continue
+        for item in billing_info:
+            if item == name_column or billing_info[item] is None:
+                continue
+            try:
+                field = next(
+                    filter(lambda field: field.billing_item == item, student_fields)
+                )
+            except StopIteration:
+                continue
+            updates.append((field, str(billing_info[item])))
+    return updates
+
+
+def measure(run: Callable[[], Any], repeats: int) -> tuple[Any, float]:
+    """Run a matching several times without its messages and return its result and best time."""
+    wall_times = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = run()
+            wall_times.append(time.perf_counter() - start)
+    return result, min(wall_times)
+
+
+def main(students: list[int], concepts: int = 20, repeats: int = 3) -> None:
+    """Runs the benchmark for each number of students and prints the time of each matching.
+
+    PARAMETERS
+    ----------
+    students : list[int]
+        Numbers of students of the page and the file to import
+    concepts : int
+        Number of billable concepts of the page
+    repeats : int
+        Number of times each matching is run, keeping the best time
+    """
+    importer = load_importer()
+    print(f"{'Students':>10}{'Fields':>10}{'Filters (s)':>14}{'Index (s)':>12}")
+    for n_students in students:
+        billing_fields, data = generate_billing(importer, n_students, concepts)
+        linear_updates, linear_time = measure(
+            lambda: find_billing_updates_linearly(
+                importer.NAME_COLUMN, data, billing_fields
+            ),
+            repeats,
+        )
+        updates, index_time = measure(
+            lambda: importer.find_billing_updates(
+                data, importer.index_billing_fields(billing_fields)
+            ),
+            repeats,
+        )
+        if updates != linear_updates:
+            raise RuntimeError("The index does not find the same fields as the filters")
+        print(
+            f"{n_students:>10}{len(billing_fields):>10}{linear_time:>14.3f}{index_time:>12.4f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="Benchmark de l'índex de la importació",
+        description="Compara com la importació troba els camps de cada valor",
+    )
+    parser.add_argument(
+        "--students",
+        type=int,
+        nargs="+",
+        default=[100, 500, 1000],
+        help="Numbers of students",
+    )
+    parser.add_argument("--concepts", type=int, default=20, help="Number of concepts")
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Times each matching is run"
+    )
+    args = parser.parse_args()
+    main(args.students, args.concepts, args.repeats)
@@ -0,0 +1,230 @@
+"""
+Benchmark of the resum app.
+
+This script measures the wall time and peak memory of each stage of the resum app (reading the export, grouping and counting the attendance, pricing and writing the summary) for both tools and several numbers of students, with synthetic exports, so that regressions are found before deploying the app. It also compares the estimated size and peak memory of the parsed export with the attendance read as codes of an enum against reading every column as text, as the app did before, and checks that both keep the same values.
+
+The script can be run from the root of the repository with the arguments:
+    uv run python -m benchmarks.benchmark_resum [--students STUDENTS [STUDENTS ...]] [--days DAYS] [--repeats REPEATS] [--output OUTPUT]
+
+Each case, and each way of parsing its export, runs in its own process. The peak memory of each stage is measured on its own where the platform allows resetting it (i.e. Linux), otherwise it is how much the stage increased the peak memory of the process. The estimated size of Polars only counts the characters of the text, not the 16 bytes that each value takes in memory, so the size of the export read as text is underestimated.
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from apps.resum import (
+    COLS_TO_BE_REMOVED,
+    ENCODING,
+    FILE_NAME_COL,
+    N_ROWS_WITHOUT_RAW_DATA,
+    TOOLS,
+    calculate_prices,
+    get_pricing_rules,
+    group_attendance,
+    read_attendance,
+    read_prices,
+    write_summary,
+)
+from benchmarks.generate_attendance import (
+    TARIFFS,
+    generate_attendance,
+    generate_prices,
+)
+from resum_batch import get_peak_memory
+
+STAGES = ["read", "group", "price", "write"]
+# Ways of keeping the attendance of the parsed export
+PARSINGS = ["text", "enum"]
+
+
+def reset_peak_memory() -> None:
+    # Linux allows resetting the peak memory of a process to the memory in use,
+    # otherwise the increase of the peak memory of the process is measured
+    with contextlib.suppress(OSError):
+        Path("/proc/self/clear_refs").write_text("5")
+
+
+def read_as_text(contents: bytes) -> pl.DataFrame:
+    # Reading of the app before the enum of the attendance, which kept every
+    # column as text
+    return (
+        pl.read_csv(contents, encoding=ENCODING, separator=";")
+        .limit(-N_ROWS_WITHOUT_RAW_DATA)
+        .drop([col for col in COLS_TO_BE_REMOVED if col != FILE_NAME_COL], strict=False)
+    )
+
+
+def measure_stage(stage: Callable[[], Any]) -> tuple[Any, float, int | None]:
+    """Run a stage and return its result, wall time in seconds and peak memory in bytes."""
+    reset_peak_memory()
+    memory_before = get_peak_memory()
+    start = time.perf_counter()
+    result = stage()
+    wall_time = time.perf_counter() - start
+    peak_memory = get_peak_memory()
+    return (
+        result,
+        wall_time,
+        peak_memory - memory_before
+        if peak_memory is not None and memory_before is not None
+        else None,
+    )
+
+
+def run_case(tool: str, n_students: int, n_days: int, repeats: int) -> dict[str, Any]:
+    """Run all the stages for a synthetic export and keep the best time of each."""
+    tool_code = next(option["code"] for option in TOOLS if option["label"] == tool)
+    contents = generate_attendance(n_students, n_days, TARIFFS[tool])
+    temporary_day_prices, permanent_discount = read_prices(
+        *generate_prices(TARIFFS[tool], tool_code), tool_code
+    )
+    wall_times: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    peak_memories: dict[str, list[int]] = {stage: [] for stage in STAGES}
+
+    def measure(stage_name: str, stage: Callable[[], Any]) -> Any:
+        result, wall_time, peak_memory = measure_stage(stage)
+        wall_times[stage_name].append(wall_time)
+        if peak_memory is not None:
+            peak_memories[stage_name].append(peak_memory)
+        return result
+
+    for _ in range(repeats):
+        export = measure("read", lambda: read_attendance(contents))
+        counted_data = measure(
+            "group",
+            lambda: group_attendance(
+                export.data.lazy(), get_pricing_rules(tool_code)
+            ).collect(),
+        )
+        summary = measure(
+            "price",
+            lambda: calculate_prices(
+                counted_data.lazy(),
+                temporary_day_prices,
+                permanent_discount,
+                tool_code,
+            ).collect(),
+        )
+        measure("write", lambda: write_summary(summary))
+    if not read_as_text(contents).equals(export.data.cast(pl.String)):
+        raise RuntimeError("The attendance read as an enum does not keep the text")
+    return {
+        "tool": tool,
+        "students": n_students,
+        "days": n_days,
+        "rows": export.data.height,
+        "size": len(contents),
+        "stages": {
+            stage: {
+                "wall_time": min(wall_times[stage]),
+                "peak_memory": max(peak_memories[stage], default=None),
+            }
+            for stage in STAGES
+        },
+    }
+
+
+def run_parsing(
+    parsing: str, tool: str, n_students: int, n_days: int
+) -> dict[str, Any]:
+    """Parse a synthetic export in one of the ways and return its estimated size and peak memory."""
+    parse = {
+        "text": read_as_text,
+        "enum": lambda contents: read_attendance(contents).data,
+    }[parsing]
+    # Parse a small export first, so that the threads of Polars are not measured
+    parse(generate_attendance(10, n_days, TARIFFS[tool]))
+    contents = generate_attendance(n_students, n_days, TARIFFS[tool])
+    data, _, peak_memory = measure_stage(lambda: parse(contents))
+    return {"size": int(data.estimated_size()), "peak_memory": peak_memory}
+
+
+def format_mebibytes(memory: int | None, decimals: int = 0) -> str:
+    return f"{memory / 2**20:>5.{decimals}f}" if memory is not None else f"{'-':>5}"
+
+
+def main(
+    students: list[int],
+    days: int = 22,
+    repeats: int = 3,
+    output: str | None = None,
+) -> None:
+    """Runs the benchmark for both tools and prints the results of each stage.
+
+    PARAMETERS
+    ----------
+    students : list[int]
+        Numbers of students of the exports to measure
+    days : int
+        Number of school days of the exports
+    repeats : int
+        Number of times each case is run, keeping the best time
+    output : str | None
+        Path of a JSON file to write the results into, e.g. to compare them later
+    """
+    cases = [(tool["label"], n_students) for tool in TOOLS for n_students in students]
+    results = []
+    print(
+        f"{'Tool':<10}{'Students':>10}{'Rows':>10}{'MB':>8}  "
+        + "".join(f"{stage + ' (s / MiB)':>22}" for stage in STAGES)
+        + "".join(f"{parsing + ' (MiB / peak)':>22}" for parsing in PARSINGS)
+    )
+    # Spawn a process for each case, so that they do not share memory or caches
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as executor:
+        for tool, n_students in cases:
+            result = executor.submit(run_case, tool, n_students, days, repeats).result()
+            result["parsed"] = {
+                parsing: executor.submit(
+                    run_parsing, parsing, tool, n_students, days
+                ).result()
+                for parsing in PARSINGS
+            }
+            results.append(result)
+            print(
+                f"{tool:<10}{n_students:>10}{result['rows']:>10}{result['size'] / 1e6:>8.1f}  "
+                + "".join(
+                    f"{measures['wall_time']:>13.3f} / "
+                    + format_mebibytes(measures["peak_memory"])
+                    for measures in result["stages"].values()
+                )
+                + "".join(
+                    f"{format_mebibytes(measures['size'], 1):>13} / "
+                    + format_mebibytes(measures["peak_memory"])
+                    for measures in result["parsed"].values()
+                )
+            )
+    if output is not None:
+        Path(output).write_text(json.dumps(results, indent=2))
+        print(f"Results written into {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="Benchmark del resum",
+        description="Mesura el temps i la memòria de cada pas del resum amb fitxers sintètics",
+    )
+    parser.add_argument(
+        "--students",
+        type=int,
+        nargs="+",
+        default=[500, 5000, 50000],
+        help="Numbers of students of the exports",
+    )
+    parser.add_argument("--days", type=int, default=22, help="Number of school days")
+    parser.add_argument("--repeats", type=int, default=3, help="Times each case is run")
+    parser.add_argument("--output", help="JSON file to write the results into")
+    args = parser.parse_args()
+    main(args.students, args.days, args.repeats, args.output)
@@ -0,0 +1,159 @@
+"""
+Benchmark of the startup of the exported resum app.
+
+This script exports the resum app to HTML/WebAssembly with the same command as build.py (i.e. in a sandbox and in run mode), serves the exported page locally and measures in a headless Chrome how long the page takes to be interactive, i.e. until the tool can be selected. Each run uses a new browser profile, so that nothing is cached, as in the first visit of the day on a school office laptop.
+
+The script can be run from the root of the repository with the arguments:
+    uv run python -m benchmarks.benchmark_startup [--app APP] [--repeats REPEATS] [--timeout TIMEOUT] [--output OUTPUT]
+
+Only the exported page is served locally: as in the deployment, Pyodide and the packages of the app are downloaded from their CDNs, so the network is also measured, as it is for the users. The median of several runs is reported to smooth its variations.
+"""
+
+import argparse
+import functools
+import json
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.wait import WebDriverWait
+
+APP_PATH = "apps/resum.py"
+# The first output of the app is the selection of the tool, which is rendered as
+# this element once Pyodide, the packages and the setup of the app are loaded
+INTERACTIVE_SELECTOR = "marimo-radio"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def export_app(app_path: str, output_dir: Path) -> Path:
+    """Export the app with the same command as the build of the deployment and return its page."""
+    output_file = output_dir / Path(app_path).with_suffix(".html")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    # In a sandbox with the packages of the script metadata of the app, as build.py
+    subprocess.run(
+        [
+            "uvx",
+            "marimo",
+            "export",
+            "html-wasm",
+            "--sandbox",
+            "--mode",
+            "run",
+            "--no-show-code",
+            app_path,
+            "-o",
+            str(output_file),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return output_file
+
+
+def measure_startup(url: str, timeout: float) -> dict[str, float]:
+    """Open the page in a new headless browser and measure when it is loaded and interactive."""
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-extensions")
+    driver = webdriver.Chrome(options=options)
+    try:
+        start = time.perf_counter()
+        driver.get(url)
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, INTERACTIVE_SELECTOR))
+        )
+        time_to_interactive = time.perf_counter() - start
+        # Time until the HTML was loaded, according to the browser
+        page_load = driver.execute_script(
+            "const [navigation] = performance.getEntriesByType('navigation');"
+            "return navigation.domContentLoadedEventEnd / 1000;"
+        )
+    finally:
+        driver.quit()
+    return {"page_load": page_load, "time_to_interactive": time_to_interactive}
+
+
+def main(
+    app_path: str = APP_PATH,
+    repeats: int = 3,
+    timeout: float = 300,
+    output: str | None = None,
+) -> None:
+    """Exports the app, serves it locally and measures its startup several times.
+
+    PARAMETERS
+    ----------
+    app_path : str
+        Path of the notebook to export
+    repeats : int
+        Number of times the page is opened, each with an empty cache
+    timeout : float
+        Maximum seconds to wait for the page to be interactive
+    output : str | None
+        Path of a JSON file to write the results into, e.g. to compare them later
+    """
+    with tempfile.TemporaryDirectory() as output_dir:
+        print(f"Exporting {app_path}...")
+        page = export_app(app_path, Path(output_dir))
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), functools.partial(QuietHandler, directory=output_dir)
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/{page.relative_to(output_dir).as_posix()}"
+        runs = []
+        try:
+            for run in range(repeats):
+                measures = measure_startup(url, timeout)
+                runs.append(measures)
+                print(
+                    f"Run {run + 1}: page loaded in {measures['page_load']:.2f} s, "
+                    f"interactive in {measures['time_to_interactive']:.2f} s"
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    times_to_interactive = [measures["time_to_interactive"] for measures in runs]
+    results = {
+        "app": app_path,
+        "runs": runs,
+        "median_time_to_interactive": statistics.median(times_to_interactive),
+        "min_time_to_interactive": min(times_to_interactive),
+    }
+    print(
+        f"Time to interactive: {results['median_time_to_interactive']:.2f} s (median), "
+        f"{results['min_time_to_interactive']:.2f} s (best)"
+    )
+    if output is not None:
+        Path(output).write_text(json.dumps(results, indent=2))
+        print(f"Results written into {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="Benchmark de l'inici",
+        description="Mesura quant triga a poder-se fer servir l'app exportada",
+    )
+    parser.add_argument("--app", default=APP_PATH, help="Notebook to export")
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Times the page is opened"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300, help="Maximum seconds to wait"
+    )
+    parser.add_argument("--output", help="JSON file to write the results into")
+    args = parser.parse_args()
+    main(args.app, args.repeats, args.timeout, args.output)
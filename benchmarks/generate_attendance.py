@@ -0,0 +1,193 @@
+"""
+Generator of synthetic attendance exports.
+
+This script generates attendance exports with the same format as the ones from Clickedu (ISO-8859-1, separated by semicolons, with a column per school day and the summary rows at the end), so that the resum app can be tested and measured without the real files of the school, which cannot be shared.
+
+The script can be run from the root of the repository with the arguments:
+    uv run python -m benchmarks.generate_attendance OUTPUT --tool TOOL [--students STUDENTS] [--days DAYS] [--month MONTH] [--seed SEED]
+"""
+
+import argparse
+import datetime
+import random
+from pathlib import Path
+
+from apps.resum import (
+    CATEGORIES,
+    ENCODING,
+    GROUP_TO_CATEGORY_LINE_TOOL_LABEL,
+    GROUP_TO_SINGLE_LINE_TOOL_LABEL,
+    N_ROWS_WITHOUT_RAW_DATA,
+    PERMANENT_TYPE,
+    TOOLS,
+    get_pricing_rules,
+)
+
+WEEKDAYS = ["dl", "dt", "dc", "dj", "dv"]
+YEARS = [
+    f"{level} / {group}"
+    for level in ["P3", "P4", "P5", "1r", "2n", "3r", "4t", "5è", "6è"]
+    for group in ["A", "B", "C"]
+]
+FIRST_NAMES = ["Àlex", "Núria", "Jordi", "Laia", "Pau", "Martí", "Júlia", "Aina"]
+LAST_NAMES = ["Puig", "Ferrer", "Vidal", "Serra", "Soler", "Martínez", "Pujol"]
+TARIFFS = {
+    GROUP_TO_SINGLE_LINE_TOOL_LABEL: ["Menjador"],
+    GROUP_TO_CATEGORY_LINE_TOOL_LABEL: [
+        "Acollida matí",
+        "Acollida tarda",
+        "Acollida migdia",
+    ],
+}
+
+
+def get_school_days(n_days: int, month: int, year: int) -> list[str]:
+    # Take the days from Monday to Friday from the beginning of the month,
+    # continuing in the next months if needed, as in an export of a longer period
+    school_days: list[str] = []
+    day = datetime.date(year, month, 1)
+    while len(school_days) < n_days:
+        if day.weekday() < len(WEEKDAYS):
+            school_days.append(f"{day:%d/%m} {WEEKDAYS[day.weekday()]}")
+        day += datetime.timedelta(days=1)
+    return school_days
+
+
+def generate_attendance(
+    n_students: int,
+    n_days: int,
+    tariffs: list[str],
+    categories: list[str] = list(CATEGORIES),
+    month: int = 10,
+    year: int = 2025,
+    duplicated_ratio: float = 0.2,
+    seed: int = 0,
+) -> bytes:
+    """Generates an attendance export with random students and attendance.
+
+    PARAMETERS
+    ----------
+    n_students : int
+        Number of students
+    n_days : int
+        Number of school days, i.e. of date columns
+    tariffs : list[str]
+        Rates of the service, one of them is chosen for each row
+    categories : list[str]
+        Kinds of inscription, one of them is chosen for each row
+    month : int
+        Month of the first date
+    year : int
+        Year of the first date, which defines the school days
+    duplicated_ratio : float
+        Ratio of students with more than one row, e.g. since they changed their inscription
+    seed : int
+        Seed of the random generator, so that the same export can be generated again
+
+    RETURNS
+    -------
+    bytes
+        Contents of the export
+    """
+    generator = random.Random(seed)
+    dates = get_school_days(n_days, month, year)
+    header = [
+        "Resum d'assistència",
+        "Curs/classe",
+        "Inscripció",
+        "Tarifa",
+        "Dates",
+        "Menú",
+        *dates,
+        "presents",
+        "absències",
+        "percentatge",
+        "Total",
+    ]
+    rows = []
+    for student in range(n_students):
+        name = f"{generator.choice(LAST_NAMES)} {generator.choice(LAST_NAMES)} {student}, {generator.choice(FIRST_NAMES)}"
+        year_and_class = generator.choice(YEARS)
+        n_rows = (
+            generator.choice([2, 3]) if generator.random() < duplicated_ratio else 1
+        )
+        for _ in range(n_rows):
+            category = generator.choice(categories)
+            # Permanent students come most of the days, while the temporary ones only some
+            is_permanent = CATEGORIES.get(category, {}).get("code") == PERMANENT_TYPE
+            attendance = generator.choices(
+                ["-", "A", "P"], [1, 1, 8] if is_permanent else [6, 1, 3], k=n_days
+            )
+            n_present = attendance.count("P")
+            n_absent = attendance.count("A")
+            rows.append(
+                [
+                    name,
+                    year_and_class,
+                    category,
+                    generator.choice(tariffs),
+                    f"{dates[0][:5]} - {dates[-1][:5]}",
+                    "Sí",
+                    *attendance,
+                    str(n_present),
+                    str(n_absent),
+                    f"{100 * n_present // max(n_present + n_absent, 1)}%",
+                    str(n_present + n_absent),
+                ]
+            )
+
+    # Add the summary rows, which have the totals of each day
+    first_date_index = header.index(dates[0])
+    daily_totals = {
+        "Total presents": ["P"],
+        "Total absents": ["A"],
+        "Total": ["P", "A"],
+        "Total sense registre": ["-"],
+    }
+    for label, values in list(daily_totals.items())[:N_ROWS_WITHOUT_RAW_DATA]:
+        totals = [
+            str(sum(row[first_date_index + day] in values for row in rows))
+            for day in range(n_days)
+        ]
+        rows.append([label, *[""] * (first_date_index - 1), *totals, *[""] * 4])
+    return ("\n".join(";".join(row) for row in [header, *rows]) + "\n").encode(ENCODING)
+
+
+def generate_prices(tariffs: list[str], tool_code: str) -> tuple[bytes, bytes]:
+    """Generates the files of prices and discounts for the given rates, with the columns the rules of the tool need."""
+    if get_pricing_rules(tool_code).rate_col is None:
+        return b"min_days;price\n0;8.5\n5;7.25\n12;6.8\n", b"discount\n3.6\n"
+    prices = "type;price;max\n" + "".join(
+        f"{tariff};{3.35 + index};{40 + 5 * index}\n"
+        for index, tariff in enumerate(tariffs)
+    )
+    discounts = "type;discount\n" + "".join(
+        f"{tariff};{2.1 + index}\n" for index, tariff in enumerate(tariffs)
+    )
+    return prices.encode(), discounts.encode()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="Generador d'assistència",
+        description="Genera fitxers d'assistència sintètics amb el format de Clickedu",
+    )
+    parser.add_argument("output", help="Path of the generated export")
+    parser.add_argument(
+        "--tool", required=True, choices=[tool["label"] for tool in TOOLS]
+    )
+    parser.add_argument("--students", type=int, default=500, help="Number of students")
+    parser.add_argument("--days", type=int, default=22, help="Number of school days")
+    parser.add_argument("--month", type=int, default=10, help="Month of the dates")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generator")
+    args = parser.parse_args()
+    Path(args.output).write_bytes(
+        generate_attendance(
+            args.students,
+            args.days,
+            TARIFFS[args.tool],
+            month=args.month,
+            seed=args.seed,
+        )
+    )
+    print(f"Generated {args.output}")
@@ -0,0 +1,188 @@
+"""
+Generator of local copies of the billing page of Clickedu.
+
+This script generates a page with the same structure as the one where the importer writes the billable concepts per student (the title, the table and a cell per student and concept with its tooltip, checkbox and text input) and a file to import into it, so that the importer can be run and measured without network nor login. The page can be opened from file:// or any local server.
+
+The script can be run from the root of the repository with the arguments:
+    uv run python -m benchmarks.mock_clickedu OUTPUT_DIR [--students STUDENTS] [--concepts CONCEPTS] [--changed-ratio CHANGED_RATIO] [--seed SEED]
+"""
+
+import argparse
+import html
+import random
+from pathlib import Path
+
+from benchmarks.generate_attendance import FIRST_NAMES, LAST_NAMES
+
+ENCODING = "ISO-8859-1"
+NAME_COLUMN = "Usuari"
+PAGE_TITLE_CLASS = "titol_pagina"
+PAGE_TITLE = "Assignació de conceptes facturables als usuaris"
+TABLE_ID = "unique_id"
+PAGE_FILE_NAME = "facturacio.html"
+IMPORT_FILE_NAME = "importacio.csv"
+# As in Clickedu, the value of a concept can only be written once it is checked
+PAGE_SCRIPT = f"""
+document.getElementById("{TABLE_ID}").addEventListener("click", (event) => {{
+    if (event.target.type !== "checkbox") return;
+    const text = event.target.parentElement.querySelector("input[type=text]");
+    text.disabled = !event.target.checked;
+    if (!event.target.checked) text.value = "";
+}});
+document.getElementById("desa").addEventListener("click", () => {{
+    document.getElementById("{TABLE_ID}").style.display = "none";
+}});
+"""
+
+
+def generate_values(
+    n_students: int, n_concepts: int, seed: int = 0
+) -> tuple[list[str], list[str], dict[tuple[str, str], str | None]]:
+    """Generates the students, concepts and value of each of them, if any."""
+    generator = random.Random(seed)
+    students = [
+        f"{generator.choice(LAST_NAMES)} {generator.choice(LAST_NAMES)} {student}, {generator.choice(FIRST_NAMES)}"
+        for student in range(n_students)
+    ]
+    concepts = [f"Concepte {concept + 1}" for concept in range(n_concepts)]
+    values = {
+        (student, concept): generator.choice([None, None, "1", "2.5", "12", "31.25"])
+        for student in students
+        for concept in concepts
+    }
+    return students, concepts, values
+
+
+def generate_billing_page(
+    students: list[str],
+    concepts: list[str],
+    values: dict[tuple[str, str], str | None],
+) -> str:
+    """Generates the billing page with the given values already assigned."""
+    rows = []
+    for student in students:
+        cells = []
+        for concept in concepts:
+            value = values[(student, concept)]
+            tooltip = html.escape(f"{student}<br />{concept} - Curs 2025-2026")
+            checkbox = (
+                '<input type="checkbox" checked>'
+                if value
+                else '<input type="checkbox">'
+            )
+            text = (
+                f'<input type="text" value="{value}">'
+                if value
+                else '<input type="text" disabled>'
+            )
+            cells.append(f'<td><div tooltip="{tooltip}">{checkbox}{text}</div></td>')
+        rows.append(f"<tr><td>{html.escape(student)}</td>{''.join(cells)}</tr>")
+    header = "".join(f"<th>{html.escape(concept)}</th>" for concept in concepts)
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Clickedu</title></head>
+<body>
+<div class="{PAGE_TITLE_CLASS}">{PAGE_TITLE}</div>
+<table id="{TABLE_ID}">
+<tr><th>{NAME_COLUMN}</th>{header}</tr>
+{"\n".join(rows)}
+</table>
+<button id="desa">Desa</button>
+<script>{PAGE_SCRIPT}</script>
+</body>
+</html>
+"""
+
+
+def generate_import_file(
+    students: list[str],
+    concepts: list[str],
+    values: dict[tuple[str, str], str | None],
+    changed_ratio: float = 1.0,
+    seed: int = 0,
+) -> bytes:
+    """Generates a file to import, changing the given ratio of the values of the page.
+
+    A student and a concept that are not in the page are also added, as in real
+    files.
+
+    PARAMETERS
+    ----------
+    students : list[str]
+        Students of the page
+    concepts : list[str]
+        Billable concepts of the page
+    values : dict[tuple[str, str], str | None]
+        Values already assigned in the page
+    changed_ratio : float
+        Ratio of values that are different from the page, e.g. lower to import a correction
+    seed : int
+        Seed of the random generator, so that the same file can be generated again
+
+    RETURNS
+    -------
+    bytes
+        Contents of the file to import
+    """
+    generator = random.Random(seed)
+    rows = [";".join([NAME_COLUMN, *concepts, "Concepte nou"])]
+    for student in [*students, "Alumne Nou, Nou"]:
+        row = [student]
+        for concept in concepts:
+            value = values.get((student, concept))
+            if generator.random() < changed_ratio:
+                # Remove the concept, assign it or change its value
+                value = "0" if value else generator.choice(["1", "3.5", "20"])
+            row.append(value or "")
+        rows.append(";".join([*row, "1"]))
+    return ("\n".join(rows) + "\n").encode(ENCODING)
+
+
+def generate_mock(
+    output_dir: Path,
+    n_students: int,
+    n_concepts: int,
+    changed_ratio: float = 1.0,
+    seed: int = 0,
+) -> tuple[Path, Path]:
+    """Writes the billing page and the file to import into the directory and returns their paths."""
+    students, concepts, values = generate_values(n_students, n_concepts, seed)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    page_path = output_dir / PAGE_FILE_NAME
+    import_path = output_dir / IMPORT_FILE_NAME
+    page_path.write_text(
+        generate_billing_page(students, concepts, values), encoding="utf-8"
+    )
+    import_path.write_bytes(
+        generate_import_file(students, concepts, values, changed_ratio, seed)
+    )
+    return page_path, import_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="Còpia de Clickedu",
+        description="Genera una còpia local de la pàgina de facturació de Clickedu i un fitxer per importar-hi",
+    )
+    parser.add_argument("output_dir", help="Directory of the generated files")
+    parser.add_argument("--students", type=int, default=500, help="Number of students")
+    parser.add_argument("--concepts", type=int, default=10, help="Number of concepts")
+    parser.add_argument(
+        "--changed-ratio",
+        type=float,
+        default=1.0,
+        help="Ratio of values of the file that are different from the page",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generator")
+    args = parser.parse_args()
+    page_path, import_path = generate_mock(
+        Path(args.output_dir),
+        args.students,
+        args.concepts,
+        args.changed_ratio,
+        args.seed,
+    )
+    print(f"Generated {page_path} and {import_path}")
+    print(
+        f"Import it with: uv run scripts/importació/importació.py {import_path} --url {page_path.resolve().as_uri()} --headless"
+    )
@@ -39,6 +39,17 @@ type_check = subprocess.run(
 if type_check.returncode != 0:
     exit()
 
+print("Running pytest...")
+tests = subprocess.run(
+    [
+        "uv",
+        "run",
+        "pytest",
+    ]
+)
+if tests.returncode != 0:
+    exit()
+
 print("Building...")
 build = subprocess.run(
     [
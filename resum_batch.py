@@ -0,0 +1,250 @@
+"""
+Batch script for the attendance summaries.
+
+This script summarizes many attendance exports at once with the same engine as the resum app, e.g. to reprocess every month of the school year for a service. The exports are processed in parallel and each summary is written with the same name the app gives to its download.
+
+The script can be run from the command line with the arguments:
+    uv run resum_batch.py INPUT [INPUT ...] --tool TOOL --prices PRICES --discounts DISCOUNTS [--output-dir OUTPUT_DIR] [--engine ENGINE] [--format FORMAT] [--charge-concept CHARGE_CONCEPT] [--refund-concept REFUND_CONCEPT]
+
+Each INPUT can be an export, a directory with exports or a glob pattern. The peak memory used to summarize each export is reported when the platform allows measuring it.
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Literal
+
+import polars as pl
+
+from apps.resum import (
+    BILLING_CONCEPTS,
+    CSV_FORMAT,
+    EXPORT_FORMATS,
+    MIN_DAYS_TO_DISCOUNT,
+    REFUNDS_COL,
+    TO_CHARGE_COL,
+    TOOLS,
+    get_summary_file_name,
+    read_attendance,
+    read_prices,
+    summarize_attendance,
+    write_summary,
+)
+
+
+def find_exports(inputs: list[str]) -> list[Path]:
+    paths: list[Path] = []
+    for input in inputs:
+        if os.path.isdir(input):
+            paths.extend(sorted(Path(input).glob("*.csv")))
+        else:
+            paths.extend(sorted(Path(path) for path in glob.glob(input)))
+    return list(dict.fromkeys(paths))  # Remove duplicates keeping the order
+
+
+def get_peak_memory() -> int | None:
+    """Peak memory of the current process in bytes, if the platform allows measuring it."""
+    try:
+        import resource
+    except ImportError:  # i.e. Windows
+        return None
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, while macOS reports bytes
+    return peak_memory if sys.platform == "darwin" else peak_memory * 1024
+
+
+def summarize_export(
+    path: Path,
+    temporary_day_prices: pl.DataFrame,
+    permanent_discount: pl.DataFrame,
+    tool_code: str,
+    min_days_to_discount: int,
+    engine: Literal["auto", "in-memory", "streaming"],
+    export_format: str,
+    concepts: dict[str, str],
+) -> tuple[str, bytes, int | None]:
+    # The streaming engine needs the categories of the export to be shared by all
+    # the steps of the summary, so they are only while it is summarized
+    with pl.StringCache():
+        export = read_attendance(path.read_bytes())
+        summary = summarize_attendance(
+            export.data.lazy(),
+            temporary_day_prices,
+            permanent_discount,
+            tool_code,
+            min_days_to_discount,
+            engine,
+        )
+        return (
+            get_summary_file_name(export, export_format),
+            write_summary(summary, export_format, concepts),
+            get_peak_memory(),
+        )
+
+
+def main(
+    inputs: list[str],
+    tool: str,
+    prices: str,
+    discounts: str,
+    output_dir: str = ".",
+    min_days_to_discount: int = MIN_DAYS_TO_DISCOUNT,
+    workers: int | None = None,
+    engine: Literal["auto", "in-memory", "streaming"] = "auto",
+    export_format: str = CSV_FORMAT,
+    concepts: dict[str, str] = BILLING_CONCEPTS,
+) -> None:
+    """Summarizes the attendance exports in parallel and writes each summary into the output directory.
+
+    PARAMETERS
+    ----------
+    inputs : list[str]
+        Exports, directories with exports or glob patterns to find them
+    tool : str
+        Label of the tool to use, which defines how the exports are grouped and priced
+    prices : str
+        Path of the file with the prices
+    discounts : str
+        Path of the file with the discounts
+    output_dir : str
+        Directory where the summaries are written
+    min_days_to_discount : int
+        Minimum number of days to start discounting absences (only for the category tool)
+    workers : int | None
+        Maximum number of processes, by default as many as processors
+    engine : Literal["auto", "in-memory", "streaming"]
+        Polars engine used to run the summaries
+    export_format : str
+        Format of the summaries, the CSV having the same format as the exports
+    concepts : dict[str, str]
+        Billable concept of Clickedu of each amount, to import the summaries into it
+    """
+    tool_code = next(option["code"] for option in TOOLS if option["label"] == tool)
+    temporary_day_prices, permanent_discount = read_prices(
+        Path(prices).read_bytes(), Path(discounts).read_bytes(), tool_code
+    )
+    exports = find_exports(inputs)
+    if not exports:
+        raise RuntimeError(f"No exports were found in {inputs}")
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    print(f"Summarizing {len(exports)} exports...")
+    written_files: dict[str, Path] = {}
+    failed_exports: list[Path] = []
+    # Spawn the processes, since forking after Polars has started its threads can
+    # deadlock, and use one per export, so that the peak memory of each is measured
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as executor:
+        futures = [
+            executor.submit(
+                summarize_export,
+                path,
+                temporary_day_prices,
+                permanent_discount,
+                tool_code,
+                min_days_to_discount,
+                engine,
+                export_format,
+                concepts,
+            )
+            for path in exports
+        ]
+        # Collect the results in order, so that the output does not depend on timing
+        for path, future in zip(exports, futures):
+            try:
+                filename, summary, peak_memory = future.result()
+            except Exception as e:
+                print(f"Could not summarize {path}: {e}")
+                failed_exports.append(path)
+                continue
+            if filename in written_files:
+                print(
+                    f"Could not summarize {path}: {written_files[filename]} has the same rate and month"
+                )
+                failed_exports.append(path)
+                continue
+            (output_path / filename).write_bytes(summary)
+            written_files[filename] = path
+            print(
+                f"{path} -> {output_path / filename}"
+                + (
+                    f" (peak memory: {peak_memory / 2**20:.0f} MiB)"
+                    if peak_memory is not None
+                    else ""
+                )
+            )
+
+    if failed_exports:
+        raise RuntimeError(
+            f"{len(failed_exports)} of {len(exports)} exports could not be summarized"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="Resum",
+        description="Agrupa i calcula els preus de molts fitxers d'assistència alhora",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Attendance exports, directories with exports or glob patterns",
+    )
+    parser.add_argument(
+        "--tool", required=True, choices=[tool["label"] for tool in TOOLS]
+    )
+    parser.add_argument("--prices", required=True, help="CSV with the prices")
+    parser.add_argument("--discounts", required=True, help="CSV with the discounts")
+    parser.add_argument("--output-dir", default=".", help="Directory for the summaries")
+    parser.add_argument(
+        "--min-days-to-discount",
+        type=int,
+        default=MIN_DAYS_TO_DISCOUNT,
+        help="Minimum number of days to start discounting absences (Acollida)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Maximum number of processes"
+    )
+    parser.add_argument(
+        "--engine",
+        default="auto",
+        choices=["auto", "in-memory", "streaming"],
+        help="Polars engine (streaming can reduce the memory for very big exports)",
+    )
+    parser.add_argument(
+        "--format",
+        default=CSV_FORMAT,
+        choices=list(EXPORT_FORMATS),
+        help="Format of the summaries (Excel has a sheet per level and the totals)",
+    )
+    parser.add_argument(
+        "--charge-concept",
+        default=BILLING_CONCEPTS[TO_CHARGE_COL],
+        help=f"Billable concept of Clickedu of the amounts to charge, to import the summaries (by default, {BILLING_CONCEPTS[TO_CHARGE_COL]})",
+    )
+    parser.add_argument(
+        "--refund-concept",
+        default=BILLING_CONCEPTS[REFUNDS_COL],
+        help=f"Billable concept of Clickedu of the refunds, to import the summaries (by default, {BILLING_CONCEPTS[REFUNDS_COL]})",
+    )
+    args = parser.parse_args()
+    main(
+        args.inputs,
+        args.tool,
+        args.prices,
+        args.discounts,
+        args.output_dir,
+        args.min_days_to_discount,
+        args.workers,
+        args.engine,
+        args.format,
+        {TO_CHARGE_COL: args.charge_concept, REFUNDS_COL: args.refund_concept},
+    )
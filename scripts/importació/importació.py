@@ -7,7 +7,9 @@ This script sets the values of the billable concepts per student defined in a CS
 The script can be run from the command line with the arguments:
     uv run scripts/importació/importació.py FILENAME
 
-The user should double-check and save afterwards. It also prints if it was not possible to add a student or a billable concept.
+The file can also be a summary of the resum app (CSV, Parquet or Arrow IPC), whose amounts to charge and refunds are imported as the billable concepts given with --charge-concept and --refund-concept. The user should double-check and save afterwards. The students are matched regardless of accents, case, punctuation and order of the words of their names, or else with the only name in the page with the same given name and surnames that only differ by a typo in some of their words, which is printed to be checked. It also prints if it was not possible to add a student or a billable concept. Students that could be several of the page, or whose most similar names in the page have another given name (e.g. a sibling), are not imported but printed with the names they could be.
+
+The values are written in batches with a script, and one by one as the user would only if that fails (or with --write-per-cell). With --only-changes, the current values are read first and only the ones that change are written, e.g. to import a correction. With --url and --headless, it can be run against a local copy of the billing page without window. The Chromedriver is downloaded once and reused while it matches the installed Chrome. With --profile, the browser keeps its profile, and so the login, between runs, and with --attach, the script attaches to a Chrome already open in the billing page (started with --remote-debugging-port) instead of opening a new one. The written values are kept in a journal next to the file until the user saves, and with --resume, an import that stopped continues with the values that are not in the page yet. With --workers, the billable concepts are split between several browser windows that import them at the same time, each of which the user takes to a billing page with its concepts, and their messages are shown as they happen, with the number of their window, and merged into a single report at the end. With --compare-scan, the time to find the billable fields in the page with a single script is compared with asking the browser for each element.
 """
 
 # /// script
@@ -21,7 +23,21 @@ The user should double-check and save afterwards. It also prints if it was not p
 # ///
 
 import argparse
+import contextlib
+import difflib
+import io
+import json
+import multiprocessing
+import queue
+import re
+import subprocess
+import time
+import unicodedata
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
 
 import polars as pl
 from selenium import webdriver
@@ -34,6 +50,35 @@ from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+
+
+NAME_COLUMN = "Usuari"
+ENCODING = "ISO-8859-1"
+# Columns of the summaries of the resum app, which can be imported as they are with
+# a billable concept per amount (by default, named as the amount)
+SUMMARY_NAME_COLUMN = "Resum d'assistència"
+TO_CHARGE_COLUMN = "Cobrar"
+REFUNDS_COLUMN = "Devolucions"
+SUMMARY_CONCEPTS = {TO_CHARGE_COLUMN: TO_CHARGE_COLUMN, REFUNDS_COLUMN: REFUNDS_COLUMN}
+LOGIN_URL = "https://santjosep.clickedu.eu/user.php?action=login"
+PAGE_TITLE_CLASS = "titol_pagina"
+PAGE_TITLE = "Assignació de conceptes facturables als usuaris"
+TABLE_ID = "unique_id"
+MAX_LOGIN_TIME_IN_SECONDS = 3 * 60
+CACHE_DIR = Path.home() / ".cache" / "small-automation-tools"
+# Path of the last Chromedriver downloaded, reused while it matches the installed Chrome
+DRIVER_CACHE_PATH = CACHE_DIR / "chromedriver.json"
+# Profile of the browser kept between imports, so that the login is remembered
+PROFILE_DIR = CACHE_DIR / "chrome-profile"
+# Students of the file that are not in the page with the same name are compared with
+# the ones sharing the beginnings of the words of the name, and the similar enough
+# are matched only if there is one with the same given name and a typo (a letter
+# more, less, changed or swapped with the next one) in some of the surnames, which
+# are long enough to tell the typo from another surname. The rest are only reported
+NAME_BLOCK_LENGTH = 3
+MIN_NAME_SIMILARITY = 0.85
+MIN_TYPO_WORD_LENGTH = 4
 
 
 @dataclass
@@ -43,6 +88,85 @@ class BillingInformation:
     element: WebElement
 
 
+@dataclass
+class BillingIndex:
+    """Billable fields of the page by student and concept, to find each of them at once.
+
+    The students are also indexed by their normalized name and by the beginnings of
+    its words, to find the ones written differently in the file.
+    """
+
+    fields: dict[tuple[str, str], BillingInformation]
+    students: set[str]
+    concepts: set[str]
+    students_by_name: dict[str, list[str]]
+    names_by_block: dict[str, set[str]]
+
+
+def fold_name(name: str) -> str:
+    """Name without accents, case nor punctuation, e.g. "Pujol Serra, Júlia" becomes "pujol serra julia"."""
+    without_accents = "".join(
+        char
+        for char in unicodedata.normalize("NFKD", name)
+        if not unicodedata.combining(char)
+    )
+    return " ".join(re.findall(r"\w+", without_accents.casefold()))
+
+
+def normalize_name(name: str) -> str:
+    """Folded name with its words sorted, so that their order does not matter either."""
+    return " ".join(sorted(fold_name(name).split()))
+
+
+def get_name_blocks(normalized_name: str) -> set[str]:
+    return {word[:NAME_BLOCK_LENGTH] for word in normalized_name.split()}
+
+
+def split_name(name: str) -> tuple[list[str], list[str]]:
+    """Folded words of the surnames and of the given name, written as "Surnames, Given name".
+
+    Without a comma, all the words are taken as the given name.
+    """
+    surnames, comma, given_name = name.partition(",")
+    if not comma:
+        return [], fold_name(name).split()
+    return fold_name(surnames).split(), fold_name(given_name).split()
+
+
+def is_typo(word: str, other_word: str) -> bool:
+    """Whether the words only differ by a letter more, less, changed or swapped with the next one."""
+    if abs(len(word) - len(other_word)) > 1:
+        return False
+    # Skip the beginning they share and compare the rest after the first difference
+    start = 0
+    while start < min(len(word), len(other_word)) and word[start] == other_word[start]:
+        start += 1
+    rest, other_rest = word[start:], other_word[start:]
+    if len(rest) != len(other_rest):
+        return rest[1:] == other_rest or rest == other_rest[1:]
+    return rest[1:] == other_rest[1:] or (
+        rest[:2] == other_rest[1::-1] and rest[2:] == other_rest[2:]
+    )
+
+
+def is_misspelling(student: str, other_student: str) -> bool:
+    """Whether the names have the same given name and the same surnames but for some typos."""
+    surnames, given_name = split_name(student)
+    other_surnames, other_given_name = split_name(other_student)
+    return (
+        given_name == other_given_name
+        and len(surnames) == len(other_surnames)
+        and all(
+            word == other_word
+            or (
+                min(len(word), len(other_word)) >= MIN_TYPO_WORD_LENGTH
+                and is_typo(word, other_word)
+            )
+            for word, other_word in zip(surnames, other_surnames)
+        )
+    )
+
+
 def extract_information_from_tooltip(
     tooltip_element: WebElement,
     billable_items: list[str],
@@ -65,47 +189,673 @@ def extract_information_from_tooltip(
         return None
 
 
-def main(filename: str) -> None:
-    """Downloads the corresponding Chromedriver if needed and writes the content of the filename into the Clickedu website.
+# Find the billable fields in the browser, returning only the ones of the given
+# items, with the same rules as extract_information_from_tooltip
+FIND_BILLING_FIELDS_SCRIPT = """
+const [table, billableItems] = arguments;
+const items = new Set(billableItems);
+const fields = [];
+for (const div of table.querySelectorAll("div[tooltip]")) {
+    const parts = div.getAttribute("tooltip").split("<br />");
+    if (parts.length !== 2) continue;
+    const item = parts[1].split("-")[0].trim();
+    if (items.has(item)) fields.push([parts[0].trim(), item, div]);
+}
+return fields;
+"""
+
+
+def find_billing_fields(
+    driver: webdriver.Chrome, table: WebElement, billable_items: list[str]
+) -> list[BillingInformation]:
+    """Finds the fields of the billable items in the table with a single call to the browser."""
+    return [
+        BillingInformation(student, item, element)
+        for student, item, element in driver.execute_script(
+            FIND_BILLING_FIELDS_SCRIPT, table, billable_items
+        )
+    ]
+
+
+def find_billing_fields_per_element(
+    table: WebElement, billable_items: list[str]
+) -> list[BillingInformation]:
+    """Finds the fields of the billable items asking the browser for each element of the table."""
+    # Needing to ignore the types since it considers it as list[BillingInformation | None] when it cannot be None due to the filter
+    return list(
+        filter(
+            lambda result: result is not None,  # type: ignore
+            map(
+                lambda div: extract_information_from_tooltip(div, billable_items),
+                table.find_elements(By.TAG_NAME, "div"),
+            ),
+        )
+    )
+
+
+def to_cents(amount: pl.Expr) -> pl.Expr:
+    # The amounts can be decimals or text with comma, as in the CSV summaries
+    return (
+        (amount.cast(pl.String).str.replace(",", ".").cast(pl.Float64) * 100)
+        .round(0)
+        .cast(pl.Int64)
+    )
+
+
+def format_cents(cents: pl.Expr) -> pl.Expr:
+    # Write the euros as the resum app does, with comma and only the needed
+    # decimals, so that 0 removes the concept
+    remaining_cents = cents.abs() % 100
+    return pl.concat_str(
+        pl.when(cents < 0).then(pl.lit("-")).otherwise(pl.lit("")),
+        (cents.abs() // 100).cast(pl.String),
+        pl.when(remaining_cents == 0)
+        .then(pl.lit(""))
+        .otherwise(
+            pl.lit(",")
+            + remaining_cents.cast(pl.String).str.zfill(2).str.strip_chars_end("0")
+        ),
+    )
+
+
+def convert_summary(
+    summary: pl.DataFrame, concepts: dict[str, str] = SUMMARY_CONCEPTS
+) -> pl.DataFrame:
+    """Reshapes a summary of the resum app into a row per student and a column per billable concept.
+
+    The amounts of each student are added up by concept, e.g. the ones of each
+    category, and the ones without value are left out, so that they are not changed.
+    """
+    amounts = (
+        summary.unpivot(
+            on=list(concepts),
+            index=SUMMARY_NAME_COLUMN,
+            variable_name=NAME_COLUMN,
+            value_name="cents",
+        )
+        .with_columns(to_cents(pl.col("cents")))
+        .drop_nulls("cents")
+        .with_columns(pl.col(NAME_COLUMN).replace_strict(concepts))
+        .pivot(
+            on=NAME_COLUMN,
+            index=SUMMARY_NAME_COLUMN,
+            values="cents",
+            aggregate_function="sum",
+            maintain_order=True,
+        )
+    )
+    return amounts.select(
+        pl.col(SUMMARY_NAME_COLUMN).alias(NAME_COLUMN),
+        *(
+            format_cents(pl.col(concept)).alias(concept)
+            for concept in dict.fromkeys(concepts.values())
+            if concept in amounts.columns
+        ),
+    )
+
+
+def read_billing_data(
+    filename: str, concepts: dict[str, str] = SUMMARY_CONCEPTS
+) -> pl.DataFrame:
+    """Reads the values to import from a CSV, Parquet or Arrow IPC file.
+
+    The file can have a column per billable concept or be a summary of the resum
+    app, whose amounts are imported as the given concepts.
+    """
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".parquet":
+        data = pl.read_parquet(filename)
+    elif suffix in [".arrow", ".ipc", ".feather"]:
+        data = pl.read_ipc(filename)
+    else:
+        data = pl.read_csv(filename, separator=";", encoding=ENCODING)
+    if SUMMARY_NAME_COLUMN in data.columns:
+        data = convert_summary(data, concepts)
+    return data
+
+
+def index_billing_fields(billing_fields: list[BillingInformation]) -> BillingIndex:
+    fields: dict[tuple[str, str], BillingInformation] = {}
+    for field in billing_fields:
+        # Keep the first field of a student and concept if there are more
+        fields.setdefault((field.student, field.billing_item), field)
+    students = {field.student for field in billing_fields}
+    students_by_name: dict[str, list[str]] = {}
+    names_by_block: dict[str, set[str]] = {}
+    for student in sorted(students):
+        name = normalize_name(student)
+        students_by_name.setdefault(name, []).append(student)
+        for block in get_name_blocks(name):
+            names_by_block.setdefault(block, set()).add(name)
+    return BillingIndex(
+        fields,
+        students,
+        {field.billing_item for field in billing_fields},
+        students_by_name,
+        names_by_block,
+    )
+
+
+def find_student(
+    student: str,
+    billing_index: BillingIndex,
+    matched_students: set[str] | None = None,
+) -> str | None:
+    """Finds the student of the page with the same name, or else a misspelling of it, printing how it was found.
+
+    No student is returned if none has the same name or a misspelling of it, or
+    several do, so that values are not written to the wrong student. The students
+    of the page that are similar enough but cannot be told apart, or that are
+    already matched with the same name by another row of the file, are printed as
+    the ones the student could be.
+    """
+    if student in billing_index.students:
+        return student
+    name = normalize_name(student)
+    students = billing_index.students_by_name.get(name, [])
+    if len(students) == 1:
+        print(f"S'ha identificat l'alumne {student} amb {students[0]}")
+        return students[0]
+    if len(students) > 1:
+        print(f"No s'ha importat l'alumne {student}, ja que podria ser: {students}")
+        return None
+
+    # Only compare with the names sharing the beginnings of all the words but one,
+    # and first with the quick upper bounds of their similarity, as difflib does
+    blocks = get_name_blocks(name)
+    shared_blocks = Counter(
+        candidate
+        for block in blocks
+        for candidate in billing_index.names_by_block.get(block, set())
+    )
+    # The order of the words is also compared as written, where typos change it less
+    matcher = difflib.SequenceMatcher(b=name)
+    ordered_matcher = difflib.SequenceMatcher(b=fold_name(student))
+    similarities = []
+    for candidate, n_shared_blocks in shared_blocks.items():
+        if n_shared_blocks < len(blocks) - 1:
+            continue
+        # The quick bounds do not depend on the order of the words
+        matcher.set_seq1(candidate)
+        if (
+            matcher.real_quick_ratio() < MIN_NAME_SIMILARITY
+            or matcher.quick_ratio() < MIN_NAME_SIMILARITY
+        ):
+            continue
+        for candidate_student in billing_index.students_by_name[candidate]:
+            ordered_matcher.set_seq1(fold_name(candidate_student))
+            similarity = max(matcher.ratio(), ordered_matcher.ratio())
+            if similarity >= MIN_NAME_SIMILARITY:
+                similarities.append((similarity, candidate_student))
+    if not similarities:
+        print(f"No s'ha trobat l'alumne {student}")
+        return None
+    similarities.sort(reverse=True)
+    misspellings = [
+        (similarity, candidate_student)
+        for similarity, candidate_student in similarities
+        if is_misspelling(student, candidate_student)
+        and candidate_student not in (matched_students or set())
+    ]
+    if len(misspellings) == 1:
+        similarity, candidate_student = misspellings[0]
+        print(
+            f"S'ha identificat l'alumne {student} amb {candidate_student} (similitud {similarity:.2f})"
+        )
+        return candidate_student
+    print(
+        f"No s'ha importat l'alumne {student}, ja que podria ser: {[candidate_student for _, candidate_student in similarities]}"
+    )
+    return None
+
+
+def find_billing_updates(
+    data: pl.DataFrame, billing_index: BillingIndex
+) -> list[tuple[BillingInformation, str]]:
+    """Finds the field for each value to import and prints the concepts and students that are not in the page.
 
     PARAMETERS
     ----------
-    filename : str
-        Path of the file with the values for the billable concepts per student
+    data : pl.DataFrame
+        Values for the billable concepts per student
+    billing_index : BillingIndex
+        Billable fields of the page
+
+    RETURNS
+    -------
+    list[tuple[BillingInformation, str]]
+        Field and value to write into it, in the order of the data
+    """
+    concepts = [
+        col
+        for col in data.columns
+        if col != NAME_COLUMN and col in billing_index.concepts
+    ]
+    print(
+        f"No s'han trobat els següents conceptes: {[col for col in data.columns if col != NAME_COLUMN and col not in billing_index.concepts]}"
+    )
+    # The students of the page with the same name as a row are not given to another
+    # row with a misspelling of it, whose values would be written twice otherwise
+    matched_students = set()
+    for student in data.get_column(NAME_COLUMN).drop_nulls().unique():
+        if student in billing_index.students:
+            matched_students.add(student)
+            continue
+        students = billing_index.students_by_name.get(normalize_name(student), [])
+        if len(students) == 1:
+            matched_students.add(students[0])
+    updates = []
+    for billing_info in data.select(NAME_COLUMN, *concepts).iter_rows(named=True):
+        student = find_student(
+            billing_info[NAME_COLUMN], billing_index, matched_students
+        )
+        if student is None:
+            continue
+        for item in concepts:
+            if billing_info[item] is None:
+                continue
+            field = billing_index.fields.get((student, item))
+            if field is None:
+                print(f"No s'ha trobat el concepte {item} per l'alumne {student}")
+                continue
+            updates.append((field, str(billing_info[item])))
+    return updates
+
+
+# Write the values of the billable fields in the browser: the checkbox is clicked as
+# the user would, so that the page enables the text input, and the value is
+# written with the events of typing it. The updates that fail are returned
+WRITE_BILLING_VALUES_SCRIPT = """
+const [updates] = arguments;
+const failed = [];
+updates.forEach(([element, value], index) => {
+    try {
+        const inputs = Array.from(element.getElementsByTagName("input"));
+        const checkbox = inputs.find((input) => input.type === "checkbox");
+        const shouldBeRemoved = value === "0";
+        if (!checkbox || checkbox.disabled) {
+            failed.push(index);
+            return;
+        }
+        if (checkbox.checked === shouldBeRemoved) checkbox.click();
+        if (shouldBeRemoved) return;
+        const text = inputs.find((input) => input.type === "text");
+        if (!text || text.disabled || text.readOnly) {
+            failed.push(index);
+            return;
+        }
+        text.focus();
+        text.value = value;
+        for (const type of ["input", "change"]) {
+            text.dispatchEvent(new Event(type, { bubbles: true }));
+        }
+        text.blur();
+    } catch (error) {
+        failed.push(index);
+    }
+});
+return failed;
+"""
+# Billable fields read or written with each call to the browser
+BATCH_SIZE = 500
+
+
+# Read the state of the billable fields in the browser: whether their checkbox is
+# checked and the value of their text input
+READ_BILLING_VALUES_SCRIPT = """
+const [elements] = arguments;
+return elements.map((element) => {
+    const inputs = Array.from(element.getElementsByTagName("input"));
+    const checkbox = inputs.find((input) => input.type === "checkbox");
+    const text = inputs.find((input) => input.type === "text");
+    return [checkbox ? checkbox.checked : false, text ? text.value : ""];
+});
+"""
+
+
+def is_same_value(current_value: str, billable_value: str) -> bool:
+    # The page can show the amounts with comma or other decimals than the file
+    try:
+        return float(current_value.replace(",", ".")) == float(
+            billable_value.replace(",", ".")
+        )
+    except ValueError:
+        return current_value.strip() == billable_value.strip()
+
+
+def find_changed_updates(
+    driver: webdriver.Chrome,
+    billing_updates: list[tuple[BillingInformation, str]],
+    print_summary: bool = True,
+) -> list[tuple[BillingInformation, str]]:
+    """Reads the current values of the billable fields in batches and returns the updates that change them, printing a summary unless told otherwise."""
+    current_values = []
+    for start in range(0, len(billing_updates), BATCH_SIZE):
+        current_values.extend(
+            driver.execute_script(
+                READ_BILLING_VALUES_SCRIPT,
+                [
+                    field.element
+                    for field, _ in billing_updates[start : start + BATCH_SIZE]
+                ],
+            )
+        )
+    changed_updates = []
+    n_removed = n_added = n_modified = 0
+    for (field, billable_value), (is_checked, current_value) in zip(
+        billing_updates, current_values
+    ):
+        if billable_value == "0":
+            if not is_checked:
+                continue
+            n_removed += 1
+        elif not is_checked:
+            n_added += 1
+        elif not is_same_value(current_value, billable_value):
+            n_modified += 1
+        else:
+            continue
+        changed_updates.append((field, billable_value))
+    if print_summary:
+        print(
+            f"Canvis respecte a Clickedu: {n_added} conceptes per afegir, {n_removed} per treure i {n_modified} valors per modificar. "
+            f"{len(billing_updates) - len(changed_updates)} valors ja eren correctes"
+        )
+    return changed_updates
+
+
+def write_billing_value(
+    driver: webdriver.Chrome,
+    input_ancestor_information: BillingInformation,
+    billable_value: str,
+) -> None:
+    """Writes a value into its billable field as the user would, one action at a time."""
+    checkbox = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable(
+            next(
+                filter(
+                    lambda input: input.get_attribute("type") == "checkbox",
+                    input_ancestor_information.element.find_elements(
+                        By.TAG_NAME, "input"
+                    ),
+                )
+            )
+        )
+    )
+    # Activate the input if it is not available yet (text input for desired value is not available otherwise)
+    should_billable_value_be_removed = billable_value == "0"
+    if (not should_billable_value_be_removed and not checkbox.is_selected()) or (
+        checkbox.is_selected() and should_billable_value_be_removed
+    ):  # Avoid type issues with string
+        ActionChains(driver).move_to_element(checkbox).pause(1).click().perform()
+    # Proceed to the next value after unclicking a cell with a 0 value
+    if should_billable_value_be_removed:
+        return
+    # Input the value
+    input = next(
+        filter(
+            lambda input: input.get_attribute("type") == "text",
+            input_ancestor_information.element.find_elements(By.TAG_NAME, "input"),
+        )
+    )
+    input.clear()  # Needed if there is a previous value
+    input.send_keys(billable_value)
+
+
+def write_billing_values(
+    driver: webdriver.Chrome,
+    billing_updates: list[tuple[BillingInformation, str]],
+    journal: TextIO | None = None,
+) -> list[tuple[BillingInformation, str]]:
+    """Writes the values into their billable fields with a call to the browser per batch and returns the ones that could not be written.
+
+    The written values of each batch are added to the journal, if any.
+    """
+    failed_updates: list[tuple[BillingInformation, str]] = []
+    for start in range(0, len(billing_updates), BATCH_SIZE):
+        batch = billing_updates[start : start + BATCH_SIZE]
+        failed_indices = driver.execute_script(
+            WRITE_BILLING_VALUES_SCRIPT,
+            [[field.element, value] for field, value in batch],
+        )
+        failed_updates.extend(batch[index] for index in failed_indices)
+        if journal is not None:
+            failed = set(failed_indices)
+            write_journal(
+                journal,
+                [update for index, update in enumerate(batch) if index not in failed],
+            )
+    return failed_updates
+
+
+def get_journal_path(filename: str, window: int | None = None) -> Path:
+    """Path of the journal of the import of the file, or of one of its windows, next to it."""
+    if window is None:
+        return Path(f"{filename}.journal")
+    return Path(f"{filename}.{window}.journal")
+
+
+def read_journal(journal_path: Path) -> set[tuple[str, str, str]]:
+    """Returns the student, concept and value of each write in the journal, if it exists."""
+    if not journal_path.exists():
+        return set()
+    written = set()
+    with journal_path.open(encoding="utf-8") as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:  # last line of an interrupted write
+                continue
+            written.add((entry["student"], entry["concept"], entry["value"]))
+    return written
+
+
+def write_journal(
+    journal: TextIO, billing_updates: list[tuple[BillingInformation, str]]
+) -> None:
+    """Appends the written values to the journal and flushes it, so that they are kept if the import stops."""
+    for field, value in billing_updates:
+        journal.write(
+            json.dumps(
+                {
+                    "student": field.student,
+                    "concept": field.billing_item,
+                    "value": value,
+                },
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
+    journal.flush()
+
+
+def find_pending_updates(
+    driver: webdriver.Chrome,
+    billing_updates: list[tuple[BillingInformation, str]],
+    written: set[tuple[str, str, str]],
+) -> list[tuple[BillingInformation, str]]:
+    """Returns the updates that are not in the journal or whose value is not in the page anymore, e.g. because the browser was closed before saving."""
+    journaled_updates = [
+        (field, value)
+        for field, value in billing_updates
+        if (field.student, field.billing_item, value) in written
+    ]
+    # Only the journaled values are read from the page, the rest are written anyway
+    lost_updates = {
+        (field.student, field.billing_item)
+        for field, _ in find_changed_updates(
+            driver, journaled_updates, print_summary=False
+        )
+    }
+    pending_updates = [
+        (field, value)
+        for field, value in billing_updates
+        if (field.student, field.billing_item, value) not in written
+        or (field.student, field.billing_item) in lost_updates
+    ]
+    print(
+        f"Reprenent la importació: {len(journaled_updates)} valors ja s'havien escrit, dels quals {len(lost_updates)} ja no són a la pàgina. "
+        f"Queden {len(pending_updates)} valors per escriure"
+    )
+    return pending_updates
+
+
+def compare_scans(
+    driver: webdriver.Chrome, table: WebElement, billable_items: list[str]
+) -> None:
+    """Prints the time to find the billable fields with a single script and per element."""
+    start = time.perf_counter()
+    fields = find_billing_fields(driver, table, billable_items)
+    script_time = time.perf_counter() - start
+    start = time.perf_counter()
+    fields_per_element = find_billing_fields_per_element(table, billable_items)
+    per_element_time = time.perf_counter() - start
+    print(
+        f"Camps trobats amb un sol script: {len(fields)} en {script_time:.2f} s. "
+        f"Element per element: {len(fields_per_element)} en {per_element_time:.2f} s"
+    )
+    if fields != fields_per_element:
+        print("Els camps trobats amb els dos mètodes no coincideixen")
+
+
+def get_major_version(version: str | None) -> str | None:
+    return version.split(".")[0] if version else None
+
+
+def get_chromedriver_version(driver_path: str) -> str | None:
+    """Asks the Chromedriver for its version, which needs no network."""
+    try:
+        output = subprocess.run(
+            [driver_path, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    # e.g. "ChromeDriver 131.0.6778.85 (...)"
+    parts = output.split()
+    return parts[1] if len(parts) > 1 else None
+
+
+def read_cached_chromedriver() -> str | None:
+    """Returns the path of the last downloaded Chromedriver, if it is remembered."""
+    try:
+        driver_path = json.loads(DRIVER_CACHE_PATH.read_text())["path"]
+    except (OSError, ValueError, KeyError, TypeError):
+        # A missing, truncated or otherwise damaged cache (e.g. not JSON or not even
+        # text) is as if there was none
+        return None
+    return driver_path if isinstance(driver_path, str) else None
+
+
+def resolve_chromedriver() -> tuple[str, bool]:
+    """Returns the path of a Chromedriver for the installed Chrome and whether it was cached.
+
+    The last downloaded Chromedriver is reused as long as its major version is the
+    one of the installed Chrome, which are both checked locally. Otherwise, the
+    corresponding one is downloaded and remembered for the next runs.
+    """
+    chrome_version = OperationSystemManager().get_browser_version_from_os(
+        ChromeType.GOOGLE
+    )
+    driver_path = read_cached_chromedriver()
+    if driver_path is not None:
+        driver_version = get_chromedriver_version(driver_path)
+        # If the version of Chrome cannot be found, the driver is tried anyway
+        if driver_version is not None and (
+            chrome_version is None
+            or get_major_version(driver_version) == get_major_version(chrome_version)
+        ):
+            return driver_path, True
+
+    print("Downloading the Chromedriver of the installed Chrome...")
+    driver_path = ChromeDriverManager().install()
+    DRIVER_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    DRIVER_CACHE_PATH.write_text(json.dumps({"path": driver_path}))
+    return driver_path, False
+
+
+def open_browser(
+    url: str = LOGIN_URL,
+    headless: bool = False,
+    driver_path: str | None = None,
+    profile_dir: str | None = None,
+    debugger_address: str | None = None,
+) -> webdriver.Chrome:
+    """Opens Chrome in the given page, or attaches to a running one in its current page.
+
+    PARAMETERS
+    ----------
+    url : str
+        Page opened in a new browser
+    headless : bool
+        Whether to run a new browser without window
+    driver_path : str | None
+        Path of the Chromedriver to use instead of the cached or downloaded one
+    profile_dir : str | None
+        Directory of the profile of a new browser, which keeps the login between runs
+    debugger_address : str | None
+        Address of a Chrome started with --remote-debugging-port to attach to, e.g.
+        127.0.0.1:9222, instead of opening a new one
+
+    RETURNS
+    -------
+    webdriver.Chrome
+        Driver of the browser
     """
     # Configure Chrome options
     opts = Options()
-    opts.add_argument("--start-maximized")
+    if debugger_address is not None:
+        opts.debugger_address = debugger_address
+    else:
+        opts.add_argument("--start-maximized")
+        if headless:
+            opts.add_argument("--headless=new")
+        if profile_dir is not None:
+            opts.add_argument(f"--user-data-dir={Path(profile_dir).resolve()}")
+
+    is_cached_driver = False
+    if driver_path is None:
+        driver_path, is_cached_driver = resolve_chromedriver()
 
     # Start the Chrome driver with the configured options and service
-    print("Opening browser...")
     try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=opts
-        )
-        driver.get("https://santjosep.clickedu.eu/user.php?action=login")
+        driver = webdriver.Chrome(service=Service(driver_path), options=opts)
     except Exception:
+        if debugger_address is not None:
+            raise RuntimeError(
+                f"Could not attach to Chrome at {debugger_address}. Start it with --remote-debugging-port and a --user-data-dir and run this script again."
+            )
+        if not is_cached_driver:
+            raise
+        # Only the remembered Chromedriver can be outdated, e.g. if Chrome was
+        # updated, so the next run will download it again
+        DRIVER_CACHE_PATH.unlink(missing_ok=True)
         raise RuntimeError(
-            "The current Chromedriver and Chrome versions do not match. Remove the Chromedriver directory and run this script again."
+            "The current Chromedriver and Chrome versions do not match. Run this script again to download the corresponding Chromedriver."
         )
+    if debugger_address is None:
+        try:
+            driver.get(url)
+        except Exception:
+            driver.quit()
+            raise
+    return driver
 
-    # Define target strings
-    PAGE_TITLE_CLASS = "titol_pagina"
-    PAGE_TITLE = "Assignació de conceptes facturables als usuaris"
-    TABLE_ID = "unique_id"
 
-    # Wait until the driver is in the correct page
+def wait_for_billing_page(
+    driver: webdriver.Chrome, timeout: float = MAX_LOGIN_TIME_IN_SECONDS
+) -> None:
+    """Waits until the browser is in the billing page."""
     errors = [NoSuchElementException, ElementNotInteractableException]
-    MAX_LOGIN_TIME_IN_SECONDS = 3 * 60
     wait = WebDriverWait(
         driver,
-        timeout=MAX_LOGIN_TIME_IN_SECONDS,
+        timeout=timeout,
         poll_frequency=2,
         ignored_exceptions=errors,
     )
-    print(
-        "Please input the login credentials in the opened browser and navigate to the billing page with the necessary students and billable concepts within three minutes"
-    )
     try:
         wait.until(
             lambda _: len(driver.find_elements(By.CLASS_NAME, PAGE_TITLE_CLASS)) == 1
@@ -118,110 +868,387 @@ def main(filename: str) -> None:
             "The page did not contain the expected elements on time. Try again"
         )
 
-    # Read the imported data
-    data = pl.read_csv(filename, separator=";", encoding="ISO-8859-1")
+
+@dataclass
+class WindowReport:
+    """Result of the import of some billable concepts in a browser window of a parallel import."""
+
+    window: int
+    concepts: list[str]
+    n_written: int
+    messages: list[str]
+    error: str | None
+
+
+class WindowMessages(io.StringIO):
+    """Output of a browser window of a parallel import, which also sends each of its lines to the main process as soon as it is complete."""
+
+    def __init__(self, window: int, messages: "queue.Queue[tuple[int, str]]") -> None:
+        super().__init__()
+        self.window = window
+        self.messages = messages
+        self.partial_line = ""
+
+    def write(self, text: str) -> int:
+        *lines, self.partial_line = (self.partial_line + text).split("\n")
+        for line in lines:
+            self.messages.put((self.window, line))
+        return super().write(text)
+
+    def flush(self) -> None:
+        # Also send the last line, even if it has no line break
+        if self.partial_line:
+            self.messages.put((self.window, self.partial_line))
+            self.partial_line = ""
+        super().flush()
+
+
+def import_in_browser(
+    data: pl.DataFrame,
+    journal_path: Path,
+    compare_scan: bool = False,
+    write_per_cell: bool = False,
+    only_changes: bool = False,
+    url: str = LOGIN_URL,
+    headless: bool = False,
+    driver_path: str | None = None,
+    profile_dir: str | None = None,
+    debugger_address: str | None = None,
+    resume: bool = False,
+    window: tuple[int, int] | None = None,
+) -> int:
+    """Opens a browser, waits for the billing page, writes the data into it and waits for the user to save, returning the number of values written.
+
+    The window, if given as its position and the number of windows, is placed
+    next to the others, so that the user can tell them apart.
+    """
+    driver = open_browser(url, headless, driver_path, profile_dir, debugger_address)
+    if window is not None and not headless and debugger_address is None:
+        arrange_window(driver, *window)
+
+    # Wait until the driver is in the correct page
+    wait_for_billing_page(driver)
 
     # Find the relevant elements to add the values for the billable concepts
-    table = driver.find_element(By.ID, "unique_id")
-    all_divs = table.find_elements(By.TAG_NAME, "div")
+    table = driver.find_element(By.ID, TABLE_ID)
     concepts_to_modify = data.columns
-    # Needing to ignore the types in filters related to this variable since it considers it as list[BillingInformation | None] when it cannot be None due to the filter
-    billing_fields = list(
-        filter(
-            lambda result: result is not None,
-            map(
-                lambda div: extract_information_from_tooltip(div, concepts_to_modify),
-                all_divs,
-            ),
+    if compare_scan:
+        compare_scans(driver, table, concepts_to_modify)
+    billing_fields = find_billing_fields(driver, table, concepts_to_modify)
+
+    billing_updates = find_billing_updates(data, index_billing_fields(billing_fields))
+
+    if resume:
+        billing_updates = find_pending_updates(
+            driver, billing_updates, read_journal(journal_path)
         )
-    )
 
-    NAME_COLUMN = "Usuari"
-    clean_data = data[
-        :,
-        # type: ignore
-        [
-            any(
-                map(
-                    lambda field: col == NAME_COLUMN or field.billing_item == col,  # type: ignore
-                    billing_fields,
+    if only_changes:
+        billing_updates = find_changed_updates(driver, billing_updates)
+
+    # Add the values to their cells, writing one by one the ones that could not be
+    # written at once, or all of them if asked to, and keep track of the written
+    # ones in case the import stops
+    with journal_path.open("a" if resume else "w", encoding="utf-8") as journal:
+        if write_per_cell:
+            failed_updates = billing_updates
+        else:
+            failed_updates = write_billing_values(driver, billing_updates, journal)
+            if failed_updates:
+                print(
+                    f"{len(failed_updates)} valors s'escriuran d'un en un, ja que no s'han pogut escriure de cop"
                 )
+        for input_ancestor_information, billable_value in failed_updates:
+            write_billing_value(driver, input_ancestor_information, billable_value)
+            write_journal(journal, [(input_ancestor_information, billable_value)])
+
+    # Nobody can save the values without window
+    if headless:
+        print(f"S'han escrit {len(billing_updates)} valors")
+        # An attached browser is kept open for the next imports
+        if debugger_address is None:
+            driver.quit()
+        return len(billing_updates)
+
+    # Wait until the user saves or 15 minutes have passed
+    MAX_WAITING_TIME_IN_SECONDS = 15 * 60
+    WebDriverWait(driver, MAX_WAITING_TIME_IN_SECONDS).until(
+        EC.invisibility_of_element((By.ID, TABLE_ID))
+    )
+    # The values are saved in Clickedu, so there is nothing to resume
+    journal_path.unlink(missing_ok=True)
+    return len(billing_updates)
+
+
+def arrange_window(driver: webdriver.Chrome, position: int, n_windows: int) -> None:
+    # Split the screen in columns, from left to right
+    width, height = driver.execute_script(
+        "return [screen.availWidth, screen.availHeight];"
+    )
+    driver.set_window_rect(
+        x=position * width // n_windows, y=0, width=width // n_windows, height=height
+    )
+
+
+def split_concepts(data: pl.DataFrame, n_parts: int) -> list[list[str]]:
+    """Splits the billable concepts of the data in parts with a similar number of values to import."""
+    # Also if the data has no concepts, which leaves no parts
+    n_values = {
+        concept: data.get_column(concept).count()
+        for concept in data.columns
+        if concept != NAME_COLUMN
+    }
+    parts: list[list[str]] = [[] for _ in range(n_parts)]
+    part_sizes = [0] * n_parts
+    # Add each concept with values, from the one with most, to the smallest part
+    for concept, concept_values in sorted(
+        n_values.items(), key=lambda item: item[1], reverse=True
+    ):
+        if concept_values == 0:
+            continue
+        smallest_part = part_sizes.index(min(part_sizes))
+        parts[smallest_part].append(concept)
+        part_sizes[smallest_part] += concept_values
+    return [part for part in parts if part]
+
+
+def import_window(
+    window: int,
+    n_windows: int,
+    data: pl.DataFrame,
+    journal_path: Path,
+    compare_scan: bool,
+    write_per_cell: bool,
+    only_changes: bool,
+    url: str,
+    headless: bool,
+    driver_path: str | None,
+    profile_dir: str | None,
+    debugger_address: str | None,
+    resume: bool,
+    messages: "queue.Queue[tuple[int, str]]",
+) -> WindowReport:
+    """Imports the data in its own browser window, sending its messages to the main process and keeping them and its error for the report."""
+    window_messages = WindowMessages(window, messages)
+    n_written = 0
+    error = None
+    try:
+        with contextlib.redirect_stdout(window_messages):
+            n_written = import_in_browser(
+                data,
+                journal_path,
+                compare_scan,
+                write_per_cell,
+                only_changes,
+                url,
+                headless,
+                driver_path,
+                profile_dir,
+                debugger_address,
+                resume,
+                (window, n_windows),
             )
-            for col in data.columns
-        ],
-    ]
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    window_messages.flush()
+    return WindowReport(
+        window,
+        [col for col in data.columns if col != NAME_COLUMN],
+        n_written,
+        window_messages.getvalue().splitlines(),
+        error,
+    )
+
+
+def print_window_messages(messages: "queue.Queue[tuple[int, str]]") -> None:
+    # Show the messages of the windows as they happen, e.g. the students that were
+    # matched by a similar name, so that they can be checked before saving
+    while True:
+        try:
+            window, message = messages.get_nowait()
+        except queue.Empty:
+            return
+        print(f"[Finestra {window + 1}] {message}")
+
+
+def import_in_parallel(
+    filename: str,
+    data: pl.DataFrame,
+    workers: int,
+    compare_scan: bool = False,
+    write_per_cell: bool = False,
+    only_changes: bool = False,
+    url: str = LOGIN_URL,
+    headless: bool = False,
+    driver_path: str | None = None,
+    profile_dir: str | None = None,
+    debugger_addresses: list[str] | None = None,
+    resume: bool = False,
+) -> None:
+    """Splits the billable concepts of the data between several browser windows, imports them at the same time and prints a single report.
+
+    Each window has its own browser, profile (within the given directory) and
+    journal, so the same file must be resumed with the same number of workers.
+    """
+    if debugger_addresses:
+        workers = len(debugger_addresses)
+    parts = split_concepts(data, workers)
+    # No window is opened if there are no concepts or all of them are empty
+    if not parts:
+        print(f"No hi ha cap valor per importar a {filename}")
+        return
+    # Resolve the driver once, instead of in every process at the same time
+    if driver_path is None:
+        driver_path, _ = resolve_chromedriver()
+
     print(
-        f"No s'han trobat els següents conceptes: {[col for col in data.columns if col not in clean_data.columns]}"
+        f"S'obriran {len(parts)} finestres del navegador, d'esquerra a dreta. En menys de tres minuts, inicieu la sessió a cada una i navegueu fins a la pàgina de facturació amb els alumnes i els conceptes següents:"
     )
+    for window, concepts in enumerate(parts):
+        print(f"  Finestra {window + 1}: {', '.join(concepts)}")
 
-    # Add each value to the correct cell and warn if any cannot be added
-    for billing_info in clean_data.iter_rows(named=True):
-        student_fields: list[BillingInformation] = list(
-            filter(
-                lambda field: field.student == billing_info[NAME_COLUMN],  # type: ignore
-                billing_fields,
+    reports: list[WindowReport] = []
+    # Spawn the processes, as resum_batch.py does, so that each window has its own
+    # driver, and send their messages through a queue shared with them
+    mp_context = multiprocessing.get_context("spawn")
+    with (
+        mp_context.Manager() as manager,
+        ProcessPoolExecutor(max_workers=len(parts), mp_context=mp_context) as executor,
+    ):
+        messages = manager.Queue()
+        futures = [
+            executor.submit(
+                import_window,
+                window,
+                len(parts),
+                data.select(NAME_COLUMN, *concepts),
+                get_journal_path(filename, window),
+                compare_scan,
+                write_per_cell,
+                only_changes,
+                url,
+                headless,
+                driver_path,
+                None if profile_dir is None else str(Path(profile_dir) / str(window)),
+                None if debugger_addresses is None else debugger_addresses[window],
+                resume,
+                messages,
             )
+            for window, concepts in enumerate(parts)
+        ]
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            # The messages of a finished window are already in the queue
+            print_window_messages(messages)
+            for future in done:
+                report = future.result()
+                reports.append(report)
+                status = (
+                    f"ha fallat: {report.error}"
+                    if report.error is not None
+                    else f"ha acabat ({report.n_written} valors)"
+                )
+                print(f"La finestra {report.window + 1} {status}")
+
+    # Merge the messages of the windows, which repeat the students not found
+    print("Resum de totes les finestres:")
+    reports.sort(key=lambda report: report.window)
+    for message in dict.fromkeys(
+        message for report in reports for message in report.messages
+    ):
+        print(message)
+    print(
+        f"S'han escrit {sum(report.n_written for report in reports)} valors en {len(reports)} finestres"
+    )
+    failed_reports = [report for report in reports if report.error is not None]
+    if failed_reports:
+        raise RuntimeError(
+            f"{len(failed_reports)} de {len(reports)} finestres no han acabat la importació (conceptes: {', '.join(concept for report in failed_reports for concept in report.concepts)}). Es poden continuar amb --resume i el mateix nombre de finestres."
         )
-        if len(student_fields) == 0:
-            print(f"No s'ha trobat l'alumne {billing_info[NAME_COLUMN]}")
-            continue
-        items = (
-            item
-            for item in billing_info
-            if item != NAME_COLUMN and billing_info[item] is not None
+
+
+def main(
+    filename: str,
+    compare_scan: bool = False,
+    write_per_cell: bool = False,
+    only_changes: bool = False,
+    url: str = LOGIN_URL,
+    headless: bool = False,
+    driver_path: str | None = None,
+    profile_dir: str | None = None,
+    debugger_addresses: list[str] | None = None,
+    resume: bool = False,
+    concepts: dict[str, str] = SUMMARY_CONCEPTS,
+    workers: int = 1,
+) -> None:
+    """Downloads the corresponding Chromedriver if needed and writes the content of the filename into the Clickedu website.
+
+    PARAMETERS
+    ----------
+    filename : str
+        Path of the file with the values for the billable concepts per student
+    compare_scan : bool
+        Whether to compare the time to find the billable fields with a single script and per element
+    write_per_cell : bool
+        Whether to write the values one by one as the user would, instead of in batches
+    only_changes : bool
+        Whether to read the current values first and only write the ones that change
+    url : str
+        Page opened in the browser, e.g. a local copy of the billing page
+    headless : bool
+        Whether to run the browser without window, which does not wait for the user to save
+    driver_path : str | None
+        Path of the Chromedriver to use instead of the cached or downloaded one
+    profile_dir : str | None
+        Directory of the browser profile kept between runs, to stay logged in
+    debugger_addresses : list[str] | None
+        Addresses of running Chromes to attach to, keeping their session and page,
+        one for each window
+    resume : bool
+        Whether to skip the values written by a previous import of the file that
+        stopped, according to its journal, once checked in the page
+    concepts : dict[str, str]
+        Billable concept of each amount of a summary of the resum app, if the file is one
+    workers : int
+        Number of browser windows importing different billable concepts at the same time
+    """
+    # Read the imported data
+    data = read_billing_data(filename, concepts)
+
+    if workers > 1 or (debugger_addresses is not None and len(debugger_addresses) > 1):
+        import_in_parallel(
+            filename,
+            data,
+            workers,
+            compare_scan,
+            write_per_cell,
+            only_changes,
+            url,
+            headless,
+            driver_path,
+            profile_dir,
+            debugger_addresses,
+            resume,
         )
-        for item in items:
-            try:
-                input_ancestor_information = next(
-                    filter(lambda field: field.billing_item == item, student_fields)
-                )
-            except StopIteration:
-                print(
-                    f"No s'ha trobat el concepte {item} per l'alumne {billing_info[NAME_COLUMN]}"
-                )
-                continue
-            checkbox = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable(
-                    next(
-                        filter(
-                            lambda input: input.get_attribute("type") == "checkbox",
-                            input_ancestor_information.element.find_elements(
-                                By.TAG_NAME, "input"
-                            ),
-                        )
-                    )
-                )
-            )
-            # Activate the input if it is not available yet (text input for desired value is not available otherwise)
-            billable_value = str(billing_info[item])
-            should_billable_value_be_removed = billable_value == "0"
-            if (
-                not should_billable_value_be_removed and not checkbox.is_selected()
-            ) or (
-                checkbox.is_selected() and should_billable_value_be_removed
-            ):  # Avoid type issues with string
-                ActionChains(driver).move_to_element(checkbox).pause(
-                    1
-                ).click().perform()
-            # Proceed to the next value after unclicking a cell with a 0 value
-            if should_billable_value_be_removed:
-                continue
-            # Input the value
-            input = next(
-                filter(
-                    lambda input: input.get_attribute("type") == "text",
-                    input_ancestor_information.element.find_elements(
-                        By.TAG_NAME, "input"
-                    ),
-                )
-            )
-            input.clear()  # Needed if there is a previous value
-            input.send_keys(billable_value)
+        return
 
-    # Wait until the user saves or 15 minutes have passed
-    MAX_WAITING_TIME_IN_SECONDS = 15 * 60
-    WebDriverWait(driver, MAX_WAITING_TIME_IN_SECONDS).until(
-        EC.invisibility_of_element((By.ID, TABLE_ID))
+    print("Opening browser...")
+    print(
+        "Please input the login credentials in the opened browser and navigate to the billing page with the necessary students and billable concepts within three minutes"
+    )
+    import_in_browser(
+        data,
+        get_journal_path(filename),
+        compare_scan,
+        write_per_cell,
+        only_changes,
+        url,
+        headless,
+        driver_path,
+        profile_dir,
+        None if debugger_addresses is None else debugger_addresses[0],
+        resume,
     )
 
 
@@ -230,6 +1257,84 @@ if __name__ == "__main__":
         prog="Importació",
         description="Importa valors assignats als conceptes facturables de CSV a Clickedu",
     )
-    parser.add_argument("filename", help="Drag and drop the CSV to be imported")
+    parser.add_argument(
+        "filename",
+        help="Drag and drop the CSV to be imported, or a summary of the resum app (also Parquet or Arrow IPC)",
+    )
+    parser.add_argument(
+        "--compare-scan",
+        action="store_true",
+        help="Compare the time to find the billable fields with a single script and per element",
+    )
+    parser.add_argument(
+        "--write-per-cell",
+        action="store_true",
+        help="Write the values one by one as the user would, instead of in batches",
+    )
+    parser.add_argument(
+        "--only-changes",
+        action="store_true",
+        help="Read the current values first and only write the ones that change, e.g. to import a correction",
+    )
+    parser.add_argument(
+        "--url",
+        default=LOGIN_URL,
+        help="Page to open, e.g. a local copy of the billing page",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run the browser without window and do not wait for the user to save, e.g. with a local page",
+    )
+    parser.add_argument(
+        "--driver",
+        help="Path of the Chromedriver to use instead of the cached or downloaded one",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=str(PROFILE_DIR),
+        help=f"Keep the browser profile, and so the login, between runs in this directory (by default, {PROFILE_DIR})",
+    )
+    parser.add_argument(
+        "--attach",
+        metavar="ADDRESS",
+        nargs="+",
+        help="Attach to a Chrome started with --remote-debugging-port, e.g. 127.0.0.1:9222, and use its current page (one address per window)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an import of the same file that stopped, skipping the values already written in the page",
+    )
+    parser.add_argument(
+        "--charge-concept",
+        default=TO_CHARGE_COLUMN,
+        help=f"Billable concept of the amounts to charge of a summary of the resum app (by default, {TO_CHARGE_COLUMN})",
+    )
+    parser.add_argument(
+        "--refund-concept",
+        default=REFUNDS_COLUMN,
+        help=f"Billable concept of the refunds of a summary of the resum app (by default, {REFUNDS_COLUMN})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of browser windows importing different billable concepts at the same time",
+    )
     args = parser.parse_args()
-    main(args.filename)
+    main(
+        args.filename,
+        args.compare_scan,
+        args.write_per_cell,
+        args.only_changes,
+        args.url,
+        args.headless,
+        args.driver,
+        args.profile,
+        args.attach,
+        args.resume,
+        {TO_CHARGE_COLUMN: args.charge_concept, REFUNDS_COLUMN: args.refund_concept},
+        args.workers,
+    )
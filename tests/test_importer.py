@@ -0,0 +1,95 @@
+"""
+Tests of how the importer finds the students of the file in the page.
+
+The students are matched with the same name, regardless of accents, case, punctuation and order of the words, or else with a misspelling of it, which must never be another student with a similar name, e.g. a sibling.
+
+The tests can be run from the root of the repository with:
+    uv run pytest
+"""
+
+from typing import Any
+
+import polars as pl
+import pytest
+
+from benchmarks.benchmark_importer_index import load_importer
+
+importer = load_importer()
+CONCEPT = "Cobrar"
+PAGE_STUDENTS = [
+    "García López, Maria",
+    "Martínez Vidal, Jordi",
+    "Serra Pujol, Laia",
+    "Ferrer Serra, Núria",
+    "Ferrer Serre, Núria",
+]
+
+
+def index_students(students: list[str]) -> Any:
+    # The elements are not needed to find the students
+    return importer.index_billing_fields(
+        [importer.BillingInformation(student, CONCEPT, None) for student in students]
+    )
+
+
+@pytest.mark.parametrize(
+    "student",
+    ["García López, Maria", "garcia LOPEZ maria", "Lopez Garcia, Maria"],
+)
+def test_finds_the_same_name(student: str) -> None:
+    assert (
+        importer.find_student(student, index_students(PAGE_STUDENTS))
+        == "García López, Maria"
+    )
+
+
+@pytest.mark.parametrize(
+    ("student", "page_student"),
+    [
+        ("Martinez Vidla, Jordi", "Martínez Vidal, Jordi"),
+        ("Martines Vidal, Jordi", "Martínez Vidal, Jordi"),
+        ("Serra Pujool, Laia", "Serra Pujol, Laia"),
+        ("Serra Pjol, Laia", "Serra Pujol, Laia"),
+    ],
+)
+def test_finds_a_misspelling(student: str, page_student: str) -> None:
+    assert importer.find_student(student, index_students(PAGE_STUDENTS)) == page_student
+
+
+def test_does_not_find_several_misspellings(capsys: pytest.CaptureFixture) -> None:
+    student = importer.find_student("Ferrer Serr, Núria", index_students(PAGE_STUDENTS))
+
+    assert student is None
+    assert "podria ser" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    ("student", "sibling"),
+    [
+        ("García López, Marta", "García López, Maria"),
+        ("Puig Ferrer, Pau", "Puig Ferrer, Pol"),
+        ("Soler Pujol, Anna", "Soler Pujol, Aina"),
+        ("Martínez Vidal, Jordina", "Martínez Vidal, Jordi"),
+    ],
+)
+def test_does_not_find_siblings(
+    student: str, sibling: str, capsys: pytest.CaptureFixture
+) -> None:
+    assert importer.find_student(student, index_students([sibling])) is None
+    # The sibling is only reported, to be checked
+    assert sibling in capsys.readouterr().out
+
+
+def test_does_not_find_a_student_matched_by_another_row() -> None:
+    data = pl.DataFrame(
+        {
+            importer.NAME_COLUMN: ["Serra Pujol, Laia", "Serra Pujool, Laia"],
+            CONCEPT: ["10", "20"],
+        }
+    )
+
+    updates = importer.find_billing_updates(data, index_students(PAGE_STUDENTS))
+
+    assert [(field.student, value) for field, value in updates] == [
+        ("Serra Pujol, Laia", "10")
+    ]
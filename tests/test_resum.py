@@ -0,0 +1,255 @@
+"""
+Differential tests of the resum app.
+
+The days of each type used to be counted row by row, with the values of each row in a struct and np.unique_counts, and the students were priced row by row as well, looking for their rate in the tables of prices. These tests check that the horizontal expressions and joins that replaced them count and price the same on synthetic exports of both tools.
+
+The tests can be run from the root of the repository with:
+    uv run pytest
+"""
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from apps.resum import (
+    CATEGORIES,
+    CATEGORY_COL,
+    DISCOUNT_COL,
+    FILE_NAME_COL,
+    LEVEL_COL,
+    MAX_PRICE_COL,
+    MIN_DAYS_COL,
+    PERMANENT_TYPE,
+    PRICE_COL,
+    REFUNDS_COL,
+    STUDENT_NAME_COL,
+    TEMPORARY_TYPE,
+    TO_CHARGE_COL,
+    TOOLS,
+    TYPE_COL,
+    calculate_prices,
+    get_pricing_rules,
+    group_attendance,
+    read_attendance,
+    read_prices,
+)
+from benchmarks.generate_attendance import TARIFFS, generate_attendance
+
+VALUES_TO_COUNT = ["-"] + [
+    category["type_to_count"] for category in CATEGORIES.values()
+]
+# Prices with more decimals than cents, a first tier above some of the days and a
+# rate without prices nor discounts (Acollida migdia)
+PRICES = {
+    "unique": (
+        b"min_days;price\n3;6.825\n8;6.015\n12;5.8333\n",
+        b"discount\n3.125\n",
+    ),
+    "category": (
+        "type;price;max\nAcollida matí;6.825;40.5\nAcollida tarda;3.3333;45\n".encode(),
+        "type;discount\nAcollida matí;3.125\nAcollida tarda;2.105\n".encode(),
+    ),
+}
+UNKNOWN_CATEGORY = "Inscripció esporàdica"
+
+
+def count_row_values(values: dict) -> dict[str, int]:
+    # Previous implementation of the count, applied to the values of each row
+    counts = np.unique_counts(list(values.values()))
+    return dict(zip(counts.values, counts.counts))
+
+
+def count_with_unique_counts(counted_data: pl.DataFrame) -> pl.DataFrame:
+    """Count the days of each type of the grouped rows as the previous implementation."""
+    date_cols = [
+        col
+        for col in counted_data.columns
+        if col
+        not in [
+            STUDENT_NAME_COL,
+            CATEGORY_COL,
+            FILE_NAME_COL,
+            LEVEL_COL,
+            *VALUES_TO_COUNT,
+        ]
+    ]
+    rows = (
+        counted_data.select(pl.col(date_cols).cast(pl.String))
+        .select(pl.struct(date_cols))
+        .to_series()
+        .to_list()
+    )
+    counts = [count_row_values(row) for row in rows]
+    return pl.DataFrame(
+        {
+            value: [row_counts.get(value) for row_counts in counts]
+            for value in VALUES_TO_COUNT
+        },
+        schema={value: pl.Int64 for value in VALUES_TO_COUNT},
+    )
+
+
+@pytest.mark.parametrize("tool", TOOLS, ids=lambda tool: tool["code"])
+@pytest.mark.parametrize("seed", range(3))
+def test_counts_match_unique_counts(tool: dict, seed: int) -> None:
+    contents = generate_attendance(200, 21, TARIFFS[tool["label"]], seed=seed)
+    export = read_attendance(contents)
+    counted_data = group_attendance(
+        export.data.lazy(), get_pricing_rules(tool["code"])
+    ).collect()
+
+    assert_frame_equal(
+        counted_data.select(VALUES_TO_COUNT), count_with_unique_counts(counted_data)
+    )
+
+
+def calculate_presence_price_in_temporary(
+    category_and_days: dict, temporary_day_prices: pl.DataFrame, is_unique_tool: bool
+) -> str:
+    # Previous implementation of the amount to charge, applied to each row
+    if (
+        category_and_days[CATEGORY_COL] not in CATEGORIES
+        or CATEGORIES[category_and_days[CATEGORY_COL]]["code"] != TEMPORARY_TYPE
+    ):
+        return ""
+    n_days = category_and_days["P"] or 0
+    price_info = next(
+        filter(
+            lambda price_info: n_days >= price_info[MIN_DAYS_COL]
+            if is_unique_tool
+            else price_info[TYPE_COL] == category_and_days[FILE_NAME_COL],
+            temporary_day_prices.iter_rows(named=True),
+        ),
+        {PRICE_COL: 0},
+    )
+    return str(
+        round(
+            min(
+                n_days * price_info[PRICE_COL],
+                price_info.get(MAX_PRICE_COL, float("inf")),
+            ),
+            2,
+        )
+    ).replace(".", ",")
+
+
+def calculate_absence_discount_in_permanent(
+    category_and_days: dict,
+    temporary_day_prices: pl.DataFrame,
+    permanent_discount: pl.DataFrame,
+    is_unique_tool: bool,
+    min_days_to_discount: int,
+) -> str:
+    # Previous implementation of the refunds, applied to each row
+    if (
+        category_and_days[CATEGORY_COL] not in CATEGORIES
+        or CATEGORIES[category_and_days[CATEGORY_COL]]["code"] != PERMANENT_TYPE
+    ):
+        return ""
+    n_days = category_and_days["A" if is_unique_tool else "P"] or 0
+    normal_price_for_category = 0
+    if not is_unique_tool:
+        n_days = n_days if min_days_to_discount > n_days else 0
+        normal_price_for_category = (
+            0
+            if n_days == 0
+            else next(
+                filter(
+                    lambda price_info: price_info[TYPE_COL]
+                    == category_and_days[FILE_NAME_COL],
+                    temporary_day_prices.iter_rows(named=True),
+                ),
+                {MAX_PRICE_COL: 0},
+            )[MAX_PRICE_COL]
+        )
+    discount = next(
+        filter(
+            lambda discount_info: is_unique_tool
+            or discount_info[TYPE_COL] == category_and_days[FILE_NAME_COL],
+            permanent_discount.iter_rows(named=True),
+        ),
+        {DISCOUNT_COL: 0},
+    )[DISCOUNT_COL]
+    return str(
+        round(n_days * (-1 if is_unique_tool else 1) * discount, 2)
+        - normal_price_for_category
+    ).replace(".", ",")
+
+
+def price_with_map_elements(
+    counted_data: pl.DataFrame,
+    temporary_day_prices: pl.DataFrame,
+    permanent_discount: pl.DataFrame,
+    is_unique_tool: bool,
+    min_days_to_discount: int,
+) -> pl.DataFrame:
+    """Price the grouped rows as the previous implementation, in cents."""
+    rows = counted_data.with_columns(pl.col(pl.Categorical).cast(pl.String)).to_dicts()
+    amounts = {
+        TO_CHARGE_COL: [
+            calculate_presence_price_in_temporary(
+                row, temporary_day_prices, is_unique_tool
+            )
+            for row in rows
+        ],
+        REFUNDS_COL: [
+            calculate_absence_discount_in_permanent(
+                row,
+                temporary_day_prices,
+                permanent_discount,
+                is_unique_tool,
+                min_days_to_discount,
+            )
+            for row in rows
+        ],
+    }
+    return pl.DataFrame(
+        {
+            col: [
+                round(float(amount.replace(",", ".")) * 100) if amount else None
+                for amount in col_amounts
+            ]
+            for col, col_amounts in amounts.items()
+        },
+        schema={col: pl.Int64 for col in amounts},
+    )
+
+
+@pytest.mark.parametrize("tool", TOOLS, ids=lambda tool: tool["code"])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("min_days_to_discount", [7, 15])
+def test_prices_match_map_elements(
+    tool: dict, seed: int, min_days_to_discount: int
+) -> None:
+    contents = generate_attendance(
+        200,
+        21,
+        TARIFFS[tool["label"]],
+        categories=[*CATEGORIES, UNKNOWN_CATEGORY],
+        seed=seed,
+    )
+    export = read_attendance(contents)
+    rules = get_pricing_rules(tool["code"])
+    counted_data = group_attendance(export.data.lazy(), rules).collect()
+    temporary_day_prices, permanent_discount = read_prices(
+        *PRICES[tool["code"]], tool["code"]
+    )
+    summary = calculate_prices(
+        counted_data.lazy(),
+        temporary_day_prices,
+        permanent_discount,
+        tool["code"],
+        min_days_to_discount,
+    ).collect()
+
+    assert_frame_equal(
+        summary.select(TO_CHARGE_COL, REFUNDS_COL),
+        price_with_map_elements(
+            counted_data,
+            temporary_day_prices,
+            permanent_discount,
+            rules.rate_col is None,
+            min_days_to_discount,
+        ),
+    )